@@ -0,0 +1,253 @@
+#!/bin/env python3
+
+import glob
+import json
+import os
+import platform
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+import fontTools
+from fontTools import ttLib
+
+# cmap を引く範囲
+LOOKUP_RANGES = {
+    "latin": [(0x0020, 0x007E), (0x00A0, 0x017F)],
+    "kana": [(0x3040, 0x30FF)],
+    "kanji": [(0x4E00, 0x9FFF)],
+    "nerd": [(0xE000, 0xF8FF), (0xF0000, 0xF1AF0)],
+}
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+# 回帰とみなす悪化率
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_REPEAT = 5
+# 1回の計測で全コードポイントを検索する回数 (検索は速いため、計測値が誤差に埋もれないよう繰り返す)
+LOOKUP_PASSES = 20
+# これより短い計測値は誤差が大きいため比較しない (秒)
+MIN_COMPARED_SECONDS = 0.001
+
+
+def main():
+    baseline_path = DEFAULT_BASELINE
+    threshold = DEFAULT_THRESHOLD
+    repeat = DEFAULT_REPEAT
+    update_baseline = False
+    targets = []
+
+    for arg in sys.argv[1:]:
+        if arg.startswith("--baseline="):
+            baseline_path = arg.split("=", 1)[1]
+        elif arg.startswith("--threshold="):
+            threshold = float(arg.split("=", 1)[1])
+        elif arg.startswith("--repeat="):
+            repeat = max(1, int(arg.split("=", 1)[1]))
+        elif arg == "--update-baseline":
+            update_baseline = True
+        elif arg.startswith("--"):
+            print(f"Unknown option: {arg}")
+            usage()
+            sys.exit(1)
+        else:
+            targets.append(arg)
+
+    font_paths = []
+    for target in targets or ["dist"]:
+        if os.path.isdir(target):
+            font_paths += sorted(glob.glob(f"{target}/*.ttf"))
+        else:
+            font_paths.append(target)
+    if len(font_paths) == 0:
+        print(f"Error: no fonts found in {', '.join(targets or ['dist'])}")
+        sys.exit(1)
+
+    results = {}
+    for font_path in font_paths:
+        print(f"benchmark {font_path}")
+        results[Path(font_path).name] = bench_font(font_path, repeat)
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "fonttools": fontTools.version,
+            "machine": platform.machine(),
+        },
+        "fonts": results,
+    }
+    print_results(results)
+
+    if update_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"write {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        print(f"Baseline {baseline_path} not found, run with --update-baseline to create it")
+        return
+
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != report["environment"]:
+        print("Warning: baseline was recorded in a different environment")
+
+    regressions = compare(baseline["fonts"], results, threshold)
+    for regression in regressions:
+        print(f"regression: {regression}")
+    if regressions:
+        print(f"{len(regressions)} regressions over {threshold:.0%}")
+        sys.exit(1)
+    print(f"No regressions over {threshold:.0%}")
+
+
+def usage():
+    print(
+        f"Usage: {sys.argv[0]} "
+        "[--baseline=<path>] [--threshold=<ratio>] [--repeat=<n>] [--update-baseline] "
+        "[<dir or font> ...]\n"
+        f"  --baseline=<path>   比較するベースライン (デフォルト: {DEFAULT_BASELINE})\n"
+        f"  --threshold=<ratio> 回帰とみなす悪化率 (デフォルト: {DEFAULT_THRESHOLD})\n"
+        f"  --repeat=<n>        各計測の繰り返し回数。最小値を採用する (デフォルト: {DEFAULT_REPEAT})\n"
+        "  --update-baseline   計測結果をベースラインとして保存する\n"
+        "  フォントを省略した場合は dist/*.ttf を計測する"
+    )
+
+
+def bench_font(font_path: str, repeat: int) -> dict:
+    """1つのフォントのテーブル読み込み・cmap 検索・glyf アクセスの時間を計測する"""
+    with open(font_path, "rb") as f:
+        data = f.read()
+
+    # ファイル読み込みの影響を除くためメモリ上のデータから開く
+    font = ttLib.TTFont(BytesIO(data), lazy=True)
+    tags = sorted(font.reader.keys())
+    font.close()
+
+    tables = {tag: best_of(repeat, parse_table, data, tag) for tag in tags}
+    cmap = {
+        name: best_of(repeat, lookup_cmap, data, ranges)
+        for name, ranges in LOOKUP_RANGES.items()
+    }
+    cmap["ivs"] = best_of(repeat, lookup_ivs, data)
+    return {
+        "size": len(data),
+        "tables": tables,
+        "cmap": cmap,
+        "glyf": best_of(repeat, access_glyphs, data),
+    }
+
+
+def best_of(repeat: int, func, *args) -> dict:
+    """repeat 回計測し、最も速かった結果を返す"""
+    return min((func(*args) for _ in range(repeat)), key=lambda result: result["seconds"])
+
+
+def parse_table(data: bytes, tag: str) -> dict:
+    """テーブル1つの読み込み時間 (依存するテーブルの読み込みを含む)"""
+    font = ttLib.TTFont(BytesIO(data), lazy=True)
+    start = time.perf_counter()
+    font[tag]
+    seconds = time.perf_counter() - start
+    font.close()
+    return {"seconds": seconds}
+
+
+def lookup_cmap(data: bytes, ranges: list) -> dict:
+    """範囲内の全コードポイントを検索する時間 (cmap の読み込みは tables/cmap で計測するため含まない)"""
+    codepoints = [cp for first, last in ranges for cp in range(first, last + 1)]
+    font = ttLib.TTFont(BytesIO(data), lazy=True)
+    cmap = font.getBestCmap()
+    start = time.perf_counter()
+    for _ in range(LOOKUP_PASSES):
+        found = sum(1 for cp in codepoints if cp in cmap)
+    seconds = time.perf_counter() - start
+    font.close()
+    return {"seconds": seconds, "lookups": len(codepoints), "found": found, "passes": LOOKUP_PASSES}
+
+
+def lookup_ivs(data: bytes) -> dict:
+    """異体字シーケンス (cmap format 14) の全シーケンスを検索する時間 (cmap の読み込みは含まない)"""
+    font = ttLib.TTFont(BytesIO(data), lazy=True)
+    cmap = font.getBestCmap()
+    format_14 = font["cmap"].getcmap(0, 5)
+    uvs_dict = format_14.uvsDict if format_14 is not None else {}
+    start = time.perf_counter()
+    for _ in range(LOOKUP_PASSES):
+        lookups = found = 0
+        for selector, entries in uvs_dict.items():
+            for base, glyph_name in entries:
+                lookups += 1
+                # None は基底文字のデフォルトグリフを使う
+                if (glyph_name or cmap.get(base)) is not None:
+                    found += 1
+    seconds = time.perf_counter() - start
+    font.close()
+    return {"seconds": seconds, "lookups": lookups, "found": found, "passes": LOOKUP_PASSES}
+
+
+def access_glyphs(data: bytes) -> dict:
+    """glyf テーブルを読み込み、全グリフを展開する時間"""
+    font = ttLib.TTFont(BytesIO(data), lazy=True)
+    start = time.perf_counter()
+    glyf = font["glyf"]
+    glyph_names = font.getGlyphOrder()
+    for glyph_name in glyph_names:
+        glyf[glyph_name]
+    seconds = time.perf_counter() - start
+    font.close()
+    return {"seconds": seconds, "glyphs": len(glyph_names)}
+
+
+def compare(baseline: dict, results: dict, threshold: float) -> list:
+    """ベースラインと比較し、threshold を超えて遅くなった計測を返す"""
+    regressions = []
+    for font_name, result in sorted(results.items()):
+        if font_name not in baseline:
+            continue
+        for metric, base_seconds, seconds in iter_metrics(baseline[font_name], result):
+            if base_seconds < MIN_COMPARED_SECONDS:
+                continue
+            if seconds > base_seconds * (1 + threshold):
+                regressions.append(
+                    f"{font_name} {metric}: {base_seconds * 1000:.2f} ms -> {seconds * 1000:.2f} ms "
+                    f"({seconds / base_seconds - 1:+.0%})"
+                )
+    return regressions
+
+
+def iter_metrics(baseline: dict, result: dict):
+    """(計測名, ベースラインの秒数, 今回の秒数) を列挙する"""
+    for group in ["tables", "cmap"]:
+        for name, measurement in sorted(result[group].items()):
+            if name in baseline.get(group, {}):
+                yield f"{group}/{name}", baseline[group][name]["seconds"], measurement["seconds"]
+    if "glyf" in baseline:
+        yield "glyf", baseline["glyf"]["seconds"], result["glyf"]["seconds"]
+
+
+def print_results(results: dict):
+    """計測結果を表示する"""
+    for font_name, result in sorted(results.items()):
+        total = sum(table["seconds"] for table in result["tables"].values())
+        print(f"{font_name}: {result['size']:,} bytes, tables {total * 1000:.1f} ms")
+        slowest = sorted(result["tables"].items(), key=lambda item: -item[1]["seconds"])[:5]
+        print("  slowest tables: " + ", ".join(
+            f"{tag.strip()} {table['seconds'] * 1000:.1f} ms" for tag, table in slowest
+        ))
+        for name, lookup in result["cmap"].items():
+            rate = lookup["lookups"] * lookup["passes"] / lookup["seconds"] if lookup["seconds"] else 0
+            print(
+                f"  cmap {name}: {lookup['found']}/{lookup['lookups']} found, "
+                f"{lookup['seconds'] * 1000:.1f} ms ({rate:,.0f} lookups/s)"
+            )
+        glyf = result["glyf"]
+        print(
+            f"  glyf: {glyf['glyphs']} glyphs, {glyf['seconds'] * 1000:.1f} ms "
+            f"({glyf['seconds'] / max(glyf['glyphs'], 1) * 1e6:.2f} us/glyph)"
+        )
+
+
+if __name__ == "__main__":
+    main()
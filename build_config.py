@@ -0,0 +1,144 @@
+import configparser
+import dataclasses
+import os
+from dataclasses import dataclass
+
+# jpdoc で欧文フォントから削除し、日本語フォントの記号を使うコードポイント
+JPDOC_SYMBOL_RANGES = (
+    (0x00A7, 0x00A7), (0x00B1, 0x00B1), (0x00B6, 0x00B6), (0x00F7, 0x00F7), (0x00D7, 0x00D7),
+    (0x21D2, 0x21D2), (0x21D4, 0x21D4), (0x25A0, 0x25A1), (0x25B2, 0x25B3), (0x25BC, 0x25BD),
+    (0x25C6, 0x25C7), (0x25CB, 0x25CB), (0x25CE, 0x25CF), (0x25E5, 0x25E5), (0x25EF, 0x25EF),
+    (0x221A, 0x221A), (0x221E, 0x221E), (0x2010, 0x2010), (0x2018, 0x201A), (0x201C, 0x201E),
+    (0x2020, 0x2021), (0x2026, 0x2026), (0x2030, 0x2030), (0x2190, 0x2193), (0x2200, 0x2200),
+    (0x2202, 0x2203), (0x2208, 0x2208), (0x220B, 0x220B), (0x2211, 0x2211), (0x2225, 0x2225),
+    (0x2227, 0x222C), (0x2260, 0x2261), (0x2282, 0x2283), (0x2286, 0x2287), (0x2500, 0x259F),
+)
+
+
+@dataclass(frozen=True)
+class BuildConfig:
+    """ビルド設定
+
+    build.ini・環境変数・コマンドライン引数から構築し、各処理に明示的に渡す。
+    不変なので、1プロセス内で複数の設定を並行してビルドできる。
+    """
+
+    version: str
+    font_name: str
+    jp_font: str
+    eng_font: str
+    source_fonts_dir: str
+    build_fonts_dir: str
+    vender_name: str
+    fontforge_prefix: str
+    fonttools_prefix: str
+    ideographic_space: str
+    half_width_str: str
+    full_width_35_str: str
+    jpdoc_str: str
+    nerd_fonts_str: str
+    invisible_zenkaku_space_str: str
+    ligature_str: str
+    em_ascent: int
+    em_descent: int
+    os2_ascent: int
+    os2_descent: int
+    os2_linegap: int
+    half_width_12: int
+    half_width_35: int
+    full_width_35: int
+    size_budget_percent: float
+
+    # fontforge_script.py のオプション
+    do_not_delete_build_dir: bool = False
+    invisible_zenkaku_space: bool = False
+    half_width: bool = False
+    jpdoc: bool = False
+    nerd_font: bool = False
+    nerd_font_sets: tuple = ()
+    reg_weight: int = 400
+    bold_weight: int = 700
+    # (Regular, Bold) ウェイトの組。空なら reg_weight / bold_weight のみ
+    weights: tuple = ()
+
+    # fonttools_script.py のオプション
+    specific_variant: str = ""
+    # None の場合は Commit Mono の機能を変更しない
+    features: tuple = None
+    woff2: bool = False
+    web_subset: bool = False
+    # 完成したフォントから Lig バリアントを作る
+    derive_ligature: bool = False
+
+    # 再現可能ビルド用の固定日時 (Unix 時間)。None の場合は現在時刻
+    source_date_epoch: int = None
+
+    @classmethod
+    def load(cls, ini_path: str = "build.ini", environ=None) -> "BuildConfig":
+        """build.ini と環境変数から設定を読み込む"""
+        if environ is None:
+            environ = os.environ
+        settings = configparser.ConfigParser()
+        settings.read(ini_path, encoding="utf-8")
+
+        def get(key):
+            return settings.get("DEFAULT", key)
+
+        source_date_epoch = environ.get("SOURCE_DATE_EPOCH")
+        return cls(
+            version=get("VERSION"),
+            font_name=get("FONT_NAME"),
+            jp_font=get("JP_FONT"),
+            eng_font=get("ENG_FONT"),
+            source_fonts_dir=environ.get("SOURCE_FONTS_DIR") or get("SOURCE_FONTS_DIR"),
+            build_fonts_dir=environ.get("BUILD_FONTS_DIR") or get("BUILD_FONTS_DIR"),
+            vender_name=get("VENDER_NAME"),
+            fontforge_prefix=get("FONTFORGE_PREFIX"),
+            fonttools_prefix=get("FONTTOOLS_PREFIX"),
+            ideographic_space=get("IDEOGRAPHIC_SPACE"),
+            half_width_str=get("HALF_WIDTH_STR"),
+            full_width_35_str=get("FULL_WIDTH_35_STR"),
+            jpdoc_str=get("JPDOC_STR"),
+            nerd_fonts_str=get("NERD_FONTS_STR"),
+            invisible_zenkaku_space_str=get("INVISIBLE_ZENKAKU_SPACE_STR"),
+            ligature_str=get("LIGATURE_STR"),
+            em_ascent=int(get("EM_ASCENT")),
+            em_descent=int(get("EM_DESCENT")),
+            os2_ascent=int(get("OS2_ASCENT")),
+            os2_descent=int(get("OS2_DESCENT")),
+            os2_linegap=int(get("OS2_LINEGAP")),
+            half_width_12=int(get("HALF_WIDTH_12")),
+            half_width_35=int(get("HALF_WIDTH_35")),
+            full_width_35=int(get("FULL_WIDTH_35")),
+            size_budget_percent=float(get("SIZE_BUDGET_PERCENT")),
+            source_date_epoch=int(source_date_epoch) if source_date_epoch else None,
+        )
+
+    def replace(self, **changes) -> "BuildConfig":
+        """一部の値を変更した新しい設定を返す"""
+        return dataclasses.replace(self, **changes)
+
+    def with_line_height(self, line_height: float) -> "BuildConfig":
+        """行高さに合わせて OS/2, hhea のメトリクスを変更した設定を返す"""
+        # HackGen互換: Typo/Win両方で調整
+        # line_height=1.12 → Typo=1.08 EM, Win=1.12 EM (HackGenと同等)
+        total = round(1000 * line_height)
+        return self.replace(
+            os2_linegap=max(0, total - 1000 - 40),  # Typo用: 約4%少なく
+            os2_ascent=880 + (total - 1000) // 2,  # Win用: 上下に分配
+            os2_descent=120 + (total - 1000) - (total - 1000) // 2,
+        )
+
+    @property
+    def compact_font_name(self) -> str:
+        """ファイル名・PostScript 名に使うスペースなしのフォント名"""
+        return self.font_name.replace(" ", "")
+
+    @property
+    def variant(self) -> str:
+        """オプションから決まるバリアント名"""
+        variant = self.half_width_str if self.half_width else self.full_width_35_str
+        variant += self.invisible_zenkaku_space_str if self.invisible_zenkaku_space else ""
+        variant += self.jpdoc_str if self.jpdoc else ""
+        variant += self.nerd_fonts_str if self.nerd_font else ""
+        return variant
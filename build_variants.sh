@@ -10,11 +10,6 @@ PYTHON_EXE=python3
 
 if [ -z "$GITHUB_ACTIONS" ]; then
     # Ensure dependencies locally
-    if [ ! -d "node_modules" ]; then
-        echo "Installing Node.js dependencies..."
-        npm install
-    fi
-
     if [ ! -d "venv" ]; then
         echo "Creating virtual environment and installing Python dependencies..."
         python3 -m venv venv
@@ -28,64 +23,115 @@ else
     echo "Running in GitHub Actions, using system Python."
 fi
 
+# Reproducible builds: pin font and zip timestamps to the last commit
+# unless SOURCE_DATE_EPOCH is already set
+if [ -z "$SOURCE_DATE_EPOCH" ]; then
+    SOURCE_DATE_EPOCH=$(git log -1 --format=%ct 2>/dev/null || true)
+fi
+if [ -n "$SOURCE_DATE_EPOCH" ]; then
+    export SOURCE_DATE_EPOCH
+    echo "Using SOURCE_DATE_EPOCH=${SOURCE_DATE_EPOCH}"
+fi
+
 # Define Paths
 ABS_PROJECT_ROOT=$(pwd)
 SOURCE_FONTS_SRC="${ABS_PROJECT_ROOT}/source_fonts"
 WORK_ROOT="${ABS_PROJECT_ROOT}/build_work"
 DIST_DIR="${ABS_PROJECT_ROOT}/dist"
 
+SOURCE_CACHE_DIR="${ABS_PROJECT_ROOT}/.cache/sources"
+
+# Link a tree: hard links, then reflinks, then a plain copy as fallbacks
+link_tree() {
+    local from=$1
+    local to=$2
+    mkdir -p "${to}"
+    cp -al "${from}/." "${to}/" 2>/dev/null \
+        || cp -R --reflink=auto "${from}/." "${to}/" 2>/dev/null \
+        || cp -R "${from}/." "${to}/"
+}
+
+# Content hash of everything that affects the prepared source
+source_cache_key() {
+    {
+        (cd "${SOURCE_FONTS_SRC}" && find . -type f ! -path "./commit-mono/*" -print0 \
+            | LC_ALL=C sort -z | xargs -0 sha256sum)
+        sha256sum customize_commit_mono.py
+        $PYTHON_EXE -c "import fontTools; print(fontTools.version)"
+        echo "--letter-spacing 0"
+    } | sha256sum | cut -c1-16
+}
+
 # Helper for preparing source
+# Read-only inputs (BIZ UD Gothic, Nerd Fonts, ...) are hard-linked from
+# source_fonts/ into a content-addressed store under .cache/sources/ and only
+# commit-mono/ is regenerated, so repeated builds reuse the staged tree.
+# Nothing may write into a source file in place: hard links share the data.
 prepare_source() {
     local name=$1
-    local features=$2
     echo "Preparing shared source for type '${name}'..."
-    
-    local src_dir="${WORK_ROOT}/source_${name}"
-    mkdir -p "${src_dir}"
-    
-    # Copy all source fonts (read-only base)
-    cp -r "${SOURCE_FONTS_SRC}/"* "${src_dir}/"
-    
-    node customize_commit_mono.js \
-        --input-dir "${src_dir}/fontlab" \
-        --output-dir "${src_dir}/commit-mono" \
-        --features "${features}" \
-        --letter-spacing 0 --line-height 1.0 > "build_logs/prepare_source_${name}.log" 2>&1
-        
+
+    local key
+    key=$(source_cache_key)
+    local cached_dir="${SOURCE_CACHE_DIR}/${key}"
+
+    if [ -d "${cached_dir}" ]; then
+        echo "  > Reusing staged source ${key}"
+    else
+        local stage_dir="${cached_dir}.tmp.$$"
+        rm -rf "${stage_dir}"
+        link_tree "${SOURCE_FONTS_SRC}" "${stage_dir}"
+
+        # commit-mono/ is regenerated, so it must be a real directory
+        # instead of links back into source_fonts/
+        rm -rf "${stage_dir}/commit-mono"
+        mkdir -p "${stage_dir}/commit-mono"
+
+        # Normalize widths and names only; ss/cv features are applied in memory
+        # by fonttools_script.py (--features), so one source serves every variant
+        if ! $PYTHON_EXE customize_commit_mono.py \
+            --input-dir "${stage_dir}/fontlab" \
+            --output-dir "${stage_dir}/commit-mono" \
+            --letter-spacing 0 > "build_logs/prepare_source_${name}.log" 2>&1; then
+            echo "Error: Source preparation failed. Check build_logs/."
+            rm -rf "${stage_dir}"
+            return 1
+        fi
+
+        # Drop stale entries and publish the new one atomically
+        find "${SOURCE_CACHE_DIR}" -mindepth 1 -maxdepth 1 \
+            ! -name "$(basename "${stage_dir}")" -exec rm -rf {} +
+        mv "${stage_dir}" "${cached_dir}"
+        echo "  > Staged source ${key}"
+    fi
+
+    link_tree "${cached_dir}" "${WORK_ROOT}/source_${name}"
     echo "  > Shared source '${name}' ready."
 }
 
-# 1. Prepare shared sources (Parallel)
+# 1. Prepare shared source
 echo "=== Step 1: Pre-generating shared assets ==="
 FEAT_DEFAULT="ss03,ss04,ss05"
 FEAT_LIGATURE="ss01,ss02,ss03,ss04,ss05"
 
-pids=""
-(prepare_source "default" "$FEAT_DEFAULT") &
-pids="$pids $!"
+prepare_source "base"
 
-(prepare_source "ligature" "$FEAT_LIGATURE") &
-pids="$pids $!"
+echo "All shared sources prepared."
 
-# Wait for source prep
-failed=0
-for pid in $pids; do
-    wait $pid || failed=1
-done
-if [ $failed -ne 0 ]; then
-    echo "Error: Source preparation failed. Check build_logs/."
-    exit 1
+# Options for fonttools_script.py
+# Set WEB_SUBSET=1 to also emit unicode-range shards and an @font-face CSS manifest
+FT_OPTIONS="--woff2"
+if [ -n "$WEB_SUBSET" ]; then
+    FT_OPTIONS="--web-subset"
 fi
 
-echo "All shared sources prepared."
-
 # Function to build a variant
 build_variant_job() {
     local variant_name=$1
-    local source_type=$2
+    local features=$2
     local ff_options=$3
     
-    local my_source="${WORK_ROOT}/source_${source_type}"
+    local my_source="${WORK_ROOT}/source_base"
     local my_build="${WORK_ROOT}/build_${variant_name}"
     local log_file="${ABS_PROJECT_ROOT}/build_logs/${variant_name}.log"
     
@@ -103,28 +149,11 @@ build_variant_job() {
         # 1. Build with FontForge
         fontforge -script fontforge_script.py ${ff_options}
         
-        # 2. Post-process with FontTools
-        $PYTHON_EXE fonttools_script.py
-        
-        # 3. Rename and Move to Dist
-        for f in ${my_build}/*.ttf; do
-            style=""
-            if [[ "$f" == *"Regular.ttf" ]]; then style="Regular"; fi
-            if [[ "$f" == *"Bold.ttf" ]]; then style="Bold"; fi
-            if [[ "$f" == *"Italic.ttf" ]]; then style="Italic"; fi
-            if [[ "$f" == *"BoldItalic.ttf" ]]; then style="BoldItalic"; fi
-            
-            if [ -n "$style" ]; then
-                new_name="${variant_name}-${style}.ttf"
-                cp "$f" "${DIST_DIR}/${new_name}"
-            fi
-        done
+        # 2. Post-process with FontTools (WOFF2 / Web subsets included)
+        $PYTHON_EXE fonttools_script.py ${FT_OPTIONS} --features=${features}
         
-        $PYTHON_EXE -c "import zipfile, glob, os; \
-            z = zipfile.ZipFile('${DIST_DIR}/${variant_name}.zip', 'w', zipfile.ZIP_DEFLATED); \
-            files = glob.glob('${DIST_DIR}/${variant_name}-*.ttf'); \
-            [z.write(f, os.path.basename(f)) for f in files]; \
-            z.close()"
+        # 3. Rename and move to dist, collect Web fonts
+        collect_variant_outputs "${variant_name}" "${my_build}"
             
     ) > "${log_file}" 2>&1
     
@@ -136,34 +165,105 @@ build_variant_job() {
     fi
 }
 
-echo "=== Step 2: Running parallel builds ==="
-build_pids=""
+# Function to derive a Lig variant from a finished default variant.
+# Only the calt lookups and names differ, so the FontForge, ttfautohint and
+# merge steps are not repeated.
+derive_ligature_job() {
+    local variant_name=$1
+    local source_variant_name=$2
+
+    local source_build="${WORK_ROOT}/build_${source_variant_name}"
+    local my_build="${WORK_ROOT}/build_${variant_name}"
+    local log_file="${ABS_PROJECT_ROOT}/build_logs/${variant_name}.log"
+
+    mkdir -p "${my_build}"
+
+    echo "  [Started] ${variant_name} (derived from ${source_variant_name})"
+
+    (
+        set -e
+        export BUILD_FONTS_DIR="${my_build}"
+
+        cp "${source_build}"/*.ttf "${my_build}/"
+        $PYTHON_EXE fonttools_script.py ${FT_OPTIONS} --derive-ligature --features=${FEAT_LIGATURE}
+
+        # Keep only the derived fonts
+        for f in "${source_build}"/*.ttf; do
+            rm "${my_build}/$(basename "$f")"
+        done
+
+        collect_variant_outputs "${variant_name}" "${my_build}"
+
+    ) > "${log_file}" 2>&1
+
+    if [ $? -eq 0 ]; then
+        echo "  [Success] ${variant_name}"
+    else
+        echo "  [FAILED ] ${variant_name} (See ${log_file})"
+        return 1
+    fi
+}
+
+# Copy a variant's fonts to dist under the release names and its Web fonts
+# (WOFF2 + @font-face CSS) to dist/web/<variant>
+collect_variant_outputs() {
+    local variant_name=$1
+    local my_build=$2
+
+    for f in ${my_build}/*.ttf; do
+        style=""
+        if [[ "$f" == *"Regular.ttf" ]]; then style="Regular"; fi
+        if [[ "$f" == *"Bold.ttf" ]]; then style="Bold"; fi
+        if [[ "$f" == *"Italic.ttf" ]]; then style="Italic"; fi
+        if [[ "$f" == *"BoldItalic.ttf" ]]; then style="BoldItalic"; fi
+
+        if [ -n "$style" ]; then
+            new_name="${variant_name}-${style}.ttf"
+            cp "$f" "${DIST_DIR}/${new_name}"
+        fi
+    done
 
-# --- Group A: Default (No Ligatures) ---
-(build_variant_job "StagedMono35NF" "default" "--nerd-font --jpdoc") &
-build_pids="$build_pids $!"
+    local web_dir="${DIST_DIR}/web/${variant_name}"
+    mkdir -p "${web_dir}"
+    cp ${my_build}/*.woff2 "${web_dir}/"
+    cp ${my_build}/*.css "${web_dir}/" 2>/dev/null || true
+}
+
+# Function to zip a variant (only after validation has passed)
+package_variant() {
+    local variant_name=$1
+    local web_dir="${DIST_DIR}/web/${variant_name}"
 
-(build_variant_job "StagedMono35NFConsole" "default" "--nerd-font") &
-build_pids="$build_pids $!"
+    $PYTHON_EXE zip_fonts.py "${DIST_DIR}/${variant_name}.zip" "${DIST_DIR}/${variant_name}"-*.ttf
+    $PYTHON_EXE zip_fonts.py "${DIST_DIR}/${variant_name}-Web.zip" "${web_dir}"/*
+}
 
-(build_variant_job "StagedMonoNF" "default" "--nerd-font --half-width --jpdoc") &
-build_pids="$build_pids $!"
+echo "=== Step 2: Running parallel builds ==="
+build_pids=""
+variant_names=""
 
-(build_variant_job "StagedMonoNFConsole" "default" "--nerd-font --half-width") &
-build_pids="$build_pids $!"
+# Start a variant build in the background, followed by its derived Lig variant
+start_variant_job() {
+    local variant_name=$1
+    local features=$2
+    local ff_options=$3
+    local ligature_variant_name=$4
+
+    (build_variant_job "${variant_name}" "${features}" "${ff_options}" \
+        && derive_ligature_job "${ligature_variant_name}" "${variant_name}") &
+    build_pids="$build_pids $!"
+    variant_names="$variant_names ${variant_name} ${ligature_variant_name}"
+}
 
-# --- Group B: Ligature (With Ligatures) ---
-(build_variant_job "StagedMono35LigNF" "ligature" "--nerd-font --jpdoc") &
-build_pids="$build_pids $!"
+# Default (no ligatures) variants; each Lig variant is derived from its
+# default counterpart by enabling ss01/ss02 in calt
+start_variant_job "StagedMono35NF" "$FEAT_DEFAULT" "--nerd-font --jpdoc" "StagedMono35LigNF"
 
-(build_variant_job "StagedMono35LigNFConsole" "ligature" "--nerd-font") &
-build_pids="$build_pids $!"
+start_variant_job "StagedMono35NFConsole" "$FEAT_DEFAULT" "--nerd-font" "StagedMono35LigNFConsole"
 
-(build_variant_job "StagedMonoLigNF" "ligature" "--nerd-font --half-width --jpdoc") &
-build_pids="$build_pids $!"
+start_variant_job "StagedMonoNF" "$FEAT_DEFAULT" "--nerd-font --half-width --jpdoc" "StagedMonoLigNF"
 
-(build_variant_job "StagedMonoLigNFConsole" "ligature" "--nerd-font --half-width") &
-build_pids="$build_pids $!"
+start_variant_job "StagedMonoNFConsole" "$FEAT_DEFAULT" "--nerd-font --half-width" "StagedMonoLigNFConsole"
 
 # Wait for all builds
 failed_builds=0
@@ -171,15 +271,31 @@ for pid in $build_pids; do
     wait $pid || failed_builds=$((failed_builds + 1))
 done
 
-if [ $failed_builds -eq 0 ]; then
-    echo "=== Step 3: All builds completed successfully! ==="
-    echo "Artifacts in dist/:"
-    ls -1 dist/*.zip
-    
-    # Cleanup work dir
-    rm -rf build_work
-else
+if [ $failed_builds -ne 0 ]; then
     echo "=== Step 3: Build completed with ${failed_builds} failures. ==="
     echo "Please check build_logs/ for details."
     exit 1
 fi
+
+echo "=== Step 3: Validating fonts in dist/ ==="
+if ! SOURCE_FONTS_DIR="${WORK_ROOT}/source_base" $PYTHON_EXE validate_fonts.py \
+    --report="build_logs/validation_report.json" "${DIST_DIR}"; then
+    echo "Validation failed. See build_logs/validation_report.json."
+    exit 1
+fi
+
+echo "=== Step 4: Recording table sizes ==="
+# Appends to size_history.json and warns about growth over SIZE_BUDGET_PERCENT
+$PYTHON_EXE size_report.py "${DIST_DIR}"
+
+echo "=== Step 5: Packaging ==="
+for variant_name in $variant_names; do
+    package_variant "${variant_name}"
+done
+
+echo "All builds completed successfully!"
+echo "Artifacts in dist/:"
+ls -1 dist/*.zip
+
+# Cleanup work dir
+rm -rf build_work
@@ -0,0 +1,58 @@
+#!/bin/bash
+set -e
+
+# Build one variant twice with the same SOURCE_DATE_EPOCH and compare the
+# SHA-256 hashes of every output (TTF, WOFF2, CSS and zip).
+#
+# Usage: ./check_reproducible.sh [fontforge_script.py options]
+#   e.g. ./check_reproducible.sh --nerd-font --half-width
+FF_OPTIONS=${*:-"--nerd-font --jpdoc"}
+FEATURES=${FEATURES:-"ss03,ss04,ss05"}
+
+# Determine Python interpreter
+PYTHON_EXE=python3
+if [ -z "$GITHUB_ACTIONS" ] && [ -d "venv" ]; then
+    PYTHON_EXE=./venv/bin/python3
+fi
+
+if [ -z "$SOURCE_DATE_EPOCH" ]; then
+    SOURCE_DATE_EPOCH=$(git log -1 --format=%ct)
+fi
+export SOURCE_DATE_EPOCH
+echo "Using SOURCE_DATE_EPOCH=${SOURCE_DATE_EPOCH}"
+
+ABS_PROJECT_ROOT=$(pwd)
+WORK_ROOT="${ABS_PROJECT_ROOT}/build_reproducible"
+rm -rf "${WORK_ROOT}"
+mkdir -p "${WORK_ROOT}/source"
+
+# Prepare the source once so both runs start from identical inputs
+cp -r "${ABS_PROJECT_ROOT}/source_fonts/"* "${WORK_ROOT}/source/"
+$PYTHON_EXE customize_commit_mono.py \
+    --input-dir "${WORK_ROOT}/source/fontlab" \
+    --output-dir "${WORK_ROOT}/source/commit-mono" \
+    --letter-spacing 0
+
+export SOURCE_FONTS_DIR="${WORK_ROOT}/source"
+
+for run in 1 2; do
+    echo "=== Build ${run} (${FF_OPTIONS}) ==="
+    export BUILD_FONTS_DIR="${WORK_ROOT}/build_${run}"
+    mkdir -p "${BUILD_FONTS_DIR}"
+
+    fontforge -script fontforge_script.py ${FF_OPTIONS}
+    $PYTHON_EXE fonttools_script.py --woff2 --features=${FEATURES}
+    $PYTHON_EXE zip_fonts.py "${BUILD_FONTS_DIR}/fonts.zip" "${BUILD_FONTS_DIR}"/*.ttf
+
+    (cd "${BUILD_FONTS_DIR}" && sha256sum *) > "${WORK_ROOT}/sha256_${run}.txt"
+done
+
+echo "=== Comparing hashes ==="
+if diff "${WORK_ROOT}/sha256_1.txt" "${WORK_ROOT}/sha256_2.txt"; then
+    cat "${WORK_ROOT}/sha256_1.txt"
+    echo "Outputs are reproducible."
+    rm -rf "${WORK_ROOT}"
+else
+    echo "Outputs differ between builds. See ${WORK_ROOT}/."
+    exit 1
+fi
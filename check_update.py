@@ -2,22 +2,86 @@ import os
 import requests
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def get_latest_tag(repo):
-    url = f"https://api.github.com/repos/{repo}/releases/latest"
-    headers = {}
+# GitHub Actions sets GITHUB_API_URL; point it at a local stub server to test offline
+API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+# ETag cache for conditional requests (304 responses don't count against the rate limit)
+CACHE_FILE = os.environ.get("CHECK_UPDATE_CACHE", ".check_update_cache.json")
+REQUEST_TIMEOUT = 10
+
+UPSTREAM_REPOS = {
+    "commit_mono": "eigilnikolajsen/commit-mono",
+    "biz_ud_gothic": "googlefonts/morisawa-biz-ud-gothic",
+    "nerd_fonts": "ryanoasis/nerd-fonts",
+}
+
+def create_session():
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=len(UPSTREAM_REPOS))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept"] = "application/vnd.github+json"
     token = os.environ.get("GITHUB_TOKEN")
     if token:
-        headers["Authorization"] = f"token {token}"
-    
+        session.headers["Authorization"] = f"token {token}"
+    return session
+
+def load_cache():
+    if not os.path.exists(CACHE_FILE):
+        return {}
     try:
-        response = requests.get(url, headers=headers)
+        with open(CACHE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable cache {CACHE_FILE}: {e}")
+        return {}
+
+def save_cache(cache):
+    with open(CACHE_FILE, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+def get_latest_tag(session, repo, cache):
+    url = f"{API_URL}/repos/{repo}/releases/latest"
+    headers = {}
+    cached = cache.get(url)
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+
+    try:
+        response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304 and cached:
+            return cached["tag_name"]
         response.raise_for_status()
-        return response.json()["tag_name"]
+        tag_name = response.json()["tag_name"]
+        etag = response.headers.get("ETag")
+        if etag:
+            cache[url] = {"etag": etag, "tag_name": tag_name}
+        return tag_name
     except Exception as e:
         print(f"Error fetching latest tag for {repo}: {e}")
         return None
 
+def get_latest_tags():
+    cache = load_cache()
+    with create_session() as session:
+        with ThreadPoolExecutor(max_workers=len(UPSTREAM_REPOS)) as executor:
+            futures = {
+                key: executor.submit(get_latest_tag, session, repo, cache)
+                for key, repo in UPSTREAM_REPOS.items()
+            }
+            tags = {key: future.result() for key, future in futures.items()}
+    save_cache(cache)
+    return tags
+
 def bump_patch_version(version):
     parts = version.split('.')
     if len(parts) != 3:
@@ -71,17 +135,13 @@ def main():
     with open("versions.json", "r") as f:
         current_versions = json.load(f)
 
-    print("Checking Commit Mono...")
-    new_cm = get_latest_tag("eigilnikolajsen/commit-mono")
-    print("Checking BIZ UD Gothic...")
-    new_biz = get_latest_tag("googlefonts/morisawa-biz-ud-gothic")
-    print("Checking Nerd Fonts...")
-    new_nf = get_latest_tag("ryanoasis/nerd-fonts")
+    print("Checking Commit Mono, BIZ UD Gothic and Nerd Fonts...")
+    latest_tags = get_latest_tags()
 
     new_versions = {
-        "commit_mono": new_cm or current_versions["commit_mono"],
-        "biz_ud_gothic": new_biz or current_versions["biz_ud_gothic"],
-        "nerd_fonts": new_nf or current_versions["nerd_fonts"],
+        "commit_mono": latest_tags["commit_mono"] or current_versions["commit_mono"],
+        "biz_ud_gothic": latest_tags["biz_ud_gothic"] or current_versions["biz_ud_gothic"],
+        "nerd_fonts": latest_tags["nerd_fonts"] or current_versions["nerd_fonts"],
         "project_version": current_versions["project_version"]
     }
 
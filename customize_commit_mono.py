@@ -0,0 +1,175 @@
+#!/bin/env python3
+
+import os
+import sys
+
+from fontTools import ttLib
+from fontTools.pens.t2CharStringPen import T2CharStringPen
+from fontTools.pens.transformPen import TransformPen
+from fontTools.varLib import instancer
+
+FONT_NAME = "CommitMono"
+DEFAULT_WIDTH = 600
+
+
+def main():
+    input_dir = "./source_fonts/fontlab"
+    output_dir = "./source_fonts/commit-mono"
+    letter_spacing = 0
+    reg_weight = "400"
+    bold_weight = "700"
+    weights = None
+
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else ""
+        if arg == "--input-dir":
+            input_dir = value
+        elif arg == "--output-dir":
+            output_dir = value
+        elif arg == "--letter-spacing":
+            letter_spacing = float(value or 0)
+        elif arg == "--regular-weight":
+            reg_weight = value
+        elif arg == "--bold-weight":
+            bold_weight = value
+        elif arg == "--weights":
+            # 例: --weights 300:600,400:700 (fontforge_script.py の --weights と同じ形式)
+            weights = [tuple(pair.split(":")) for pair in value.split(",") if pair]
+        elif arg == "--line-height":
+            # 行高さは fontforge_script.py / fonttools_script.py で調整する
+            pass
+        else:
+            print(f"Unknown option: {arg}")
+            sys.exit(1)
+        i += 2
+
+    # Actions から空文字が渡された場合のデフォルト値
+    reg_weight = reg_weight or "400"
+    bold_weight = bold_weight or "700"
+    if not weights:
+        weights = [(reg_weight, bold_weight)]
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    styles = []
+    for reg, bold in weights:
+        for style in [
+            (reg, False, "Regular"),
+            (reg, True, "Italic"),
+            (bold, False, "Bold"),
+            (bold, True, "Bold Italic"),
+        ]:
+            if style not in styles:
+                styles.append(style)
+
+    files = os.listdir(input_dir)
+    variable_fonts = {}
+    for weight, italic, style_name in styles:
+        slope = "Italic" if italic else "Regular"
+        pattern = f"{weight}{slope}.otf"
+        matched_files = [f for f in files if f.endswith(pattern)]
+        if matched_files:
+            print(f"Processing {matched_files[0]}...")
+            font = ttLib.TTFont(os.path.join(input_dir, matched_files[0]))
+        else:
+            # 静的フォントが無いウェイトは可変フォントからインスタンス化する
+            if italic not in variable_fonts:
+                variable_fonts[italic] = open_variable_font(input_dir, files, italic)
+            if variable_fonts[italic] is None:
+                print(f"File with pattern {pattern} not found in {input_dir}")
+                print(f"Available files: {', '.join(files)}")
+                continue
+            print(f"Instancing wght={weight} ({slope}) from variable font...")
+            font = instancer.instantiateVariableFont(
+                variable_fonts[italic], {"wght": float(weight)}, updateFontNames=False
+            )
+
+        customize_font(font, letter_spacing, style_name)
+        extension = ".otf" if "CFF " in font else ".ttf"
+        output_path = os.path.join(output_dir, f"CommitMono-{weight}-{slope}{extension}")
+        font.save(output_path)
+        print(f"Saved to {output_path}")
+
+
+def open_variable_font(input_dir: str, files: list, italic: bool):
+    """wght 軸を持つ可変フォントを開く。見つからなければ None を返す"""
+    for filename in sorted(files):
+        if not filename.endswith((".ttf", ".otf")) or ("Italic" in filename) != italic:
+            continue
+        font = ttLib.TTFont(os.path.join(input_dir, filename))
+        if "fvar" in font and any(axis.axisTag == "wght" for axis in font["fvar"].axes):
+            return font
+        font.close()
+    return None
+
+
+def customize_font(font: ttLib.TTFont, letter_spacing: float, style_name: str):
+    """字間と名前を調整する
+
+    ss/cv 機能の適用は fonttools_script.py の freeze_features で行う。
+    """
+    set_letter_spacing(font, letter_spacing)
+    set_names(font, style_name)
+
+
+def set_letter_spacing(font: ttLib.TTFont, letter_spacing: float):
+    """全グリフの送り幅を揃え、字間分だけアウトラインを右に移動する"""
+    move_amount = letter_spacing * 5
+    new_width = DEFAULT_WIDTH + letter_spacing * 10
+
+    hmtx = font["hmtx"]
+    if "glyf" in font:
+        glyf = font["glyf"]
+        for glyph_name in font.getGlyphOrder():
+            width, lsb = hmtx[glyph_name]
+            glyph = glyf[glyph_name]
+            if move_amount != 0 and glyph.numberOfContours > 0:
+                glyph.coordinates.translate((move_amount, 0))
+                glyph.coordinates.toInt()
+                glyph.recalcBounds(glyf)
+            hmtx[glyph_name] = (round(new_width), round(lsb + move_amount))
+    else:
+        cff = font["CFF "].cff
+        top_dict = cff.topDictIndex[0]
+        char_strings = top_dict.CharStrings
+        private = top_dict.Private
+        glyph_set = font.getGlyphSet()
+
+        for glyph_name in font.getGlyphOrder():
+            width, lsb = hmtx[glyph_name]
+            if width == new_width and move_amount == 0:
+                continue
+
+            if new_width == getattr(private, "defaultWidthX", 0):
+                char_string_width = None
+            else:
+                char_string_width = new_width - getattr(private, "nominalWidthX", 0)
+            pen = T2CharStringPen(char_string_width, glyph_set)
+            glyph_set[glyph_name].draw(TransformPen(pen, (1, 0, 0, 1, move_amount, 0)))
+            char_string = pen.getCharString(private=private, globalSubrs=cff.GlobalSubrs)
+            char_strings[glyph_name] = char_string
+            hmtx[glyph_name] = (round(new_width), round(lsb + move_amount))
+
+    font["hhea"].advanceWidthMax = round(new_width)
+    font["OS/2"].xAvgCharWidth = round(new_width)
+
+
+def set_names(font: ttLib.TTFont, style_name: str):
+    """フォント名を CommitMono に統一する"""
+    name_table = font["name"]
+    names = {
+        1: FONT_NAME,
+        2: style_name,
+        4: f"{FONT_NAME} {style_name}",
+        6: f"{FONT_NAME}-{style_name.replace(' ', '')}",
+    }
+    for name_id, value in names.items():
+        name_table.setName(value, name_id, 3, 1, 0x409)
+        name_table.setName(value, name_id, 1, 0, 0)
+
+
+if __name__ == "__main__":
+    main()
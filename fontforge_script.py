@@ -1,41 +1,17 @@
 #!fontforge --lang=py -script
 
-import configparser
 import math
 import os
 import shutil
 import sys
-import uuid
+import tempfile
+import threading
 
 import fontforge
 import psMat
 
-# 設定読み込み
-settings = configparser.ConfigParser()
-settings.read("build.ini", encoding="utf-8")
-
-VERSION = settings.get("DEFAULT", "VERSION")
-FONT_NAME = settings.get("DEFAULT", "FONT_NAME")
-JP_FONT = settings.get("DEFAULT", "JP_FONT")
-ENG_FONT = settings.get("DEFAULT", "ENG_FONT")
-SOURCE_FONTS_DIR = os.environ.get("SOURCE_FONTS_DIR") or settings.get("DEFAULT", "SOURCE_FONTS_DIR")
-BUILD_FONTS_DIR = os.environ.get("BUILD_FONTS_DIR") or settings.get("DEFAULT", "BUILD_FONTS_DIR")
-VENDER_NAME = settings.get("DEFAULT", "VENDER_NAME")
-FONTFORGE_PREFIX = settings.get("DEFAULT", "FONTFORGE_PREFIX")
-IDEOGRAPHIC_SPACE = settings.get("DEFAULT", "IDEOGRAPHIC_SPACE")
-HALF_WIDTH_STR = settings.get("DEFAULT", "HALF_WIDTH_STR")
-FULL_WIDTH_35_STR = settings.get("DEFAULT", "FULL_WIDTH_35_STR")
-INVISIBLE_ZENKAKU_SPACE_STR = settings.get("DEFAULT", "INVISIBLE_ZENKAKU_SPACE_STR")
-JPDOC_STR = settings.get("DEFAULT", "JPDOC_STR")
-NERD_FONTS_STR = settings.get("DEFAULT", "NERD_FONTS_STR")
-EM_ASCENT = int(settings.get("DEFAULT", "EM_ASCENT"))
-EM_DESCENT = int(settings.get("DEFAULT", "EM_DESCENT"))
-OS2_ASCENT = int(settings.get("DEFAULT", "OS2_ASCENT"))
-OS2_DESCENT = int(settings.get("DEFAULT", "OS2_DESCENT"))
-OS2_LINEGAP = int(settings.get("DEFAULT", "OS2_LINEGAP"))
-HALF_WIDTH_12 = int(settings.get("DEFAULT", "HALF_WIDTH_12"))
-HALF_WIDTH_35 = int(settings.get("DEFAULT", "HALF_WIDTH_35"))
-FULL_WIDTH_35 = int(settings.get("DEFAULT", "FULL_WIDTH_35"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from build_config import JPDOC_SYMBOL_RANGES, BuildConfig  # noqa: E402
 
 COPYRIGHT = """[Commit Mono]
 Copyright (c) Eigil Nikolajsen https://github.com/eigilnikolajsen/commit-mono
@@ -47,160 +23,217 @@ Copyright 2022 The BIZ UDGothic Project Authors https://github.com/googlefonts/m
 Copyright 2022 Yuko Otawara
 """  # noqa: E501
 
-options = {}
-nerd_font = None
-REG_WEIGHT = 400
-BOLD_WEIGHT = 700
+# Nerd Fonts のアイコンセット (https://github.com/ryanoasis/nerd-fonts/wiki/Glyph-Sets-and-Code-Points)
+NERD_FONT_SETS = {
+    "powerline": [(0xE0A0, 0xE0A2), (0xE0B0, 0xE0B3)],
+    "powerline-extra": [(0xE0A3, 0xE0A3), (0xE0B4, 0xE0C8), (0xE0CA, 0xE0CA), (0xE0CC, 0xE0D7)],
+    "pomicons": [(0xE000, 0xE00A)],
+    "font-awesome-extension": [(0xE200, 0xE2A9)],
+    "weather": [(0xE300, 0xE3E3)],
+    "seti-ui": [(0xE5FA, 0xE6B7)],
+    "devicons": [(0xE700, 0xE8EF)],
+    "codicons": [(0xEA60, 0xEC1E)],
+    "font-awesome": [(0xED00, 0xF2FF)],
+    "font-logos": [(0xF300, 0xF381)],
+    "octicons": [(0xF400, 0xF533), (0x2665, 0x2665), (0x26A1, 0x26A1)],
+    "material-design": [(0xF0001, 0xF1AF0)],
+    "iec-power": [(0x23FB, 0x23FE), (0x2B58, 0x2B58)],
+}
+
+# 調整済み Nerd Fonts のキャッシュ (調整に影響する設定値ごと)
+nerd_font_cache = {}
+nerd_font_lock = threading.Lock()
 
 
 def main():
-    get_options()
-    if options.get("unknown-option"):
+    config = get_options(sys.argv[1:], BuildConfig.load())
+    if config is None:
         usage()
-        return
+        sys.exit(1)
+    build(config)
 
-    # buildディレクトリ作成
-    if os.path.exists(BUILD_FONTS_DIR) and not options.get("do-not-delete-build-dir"):
-        shutil.rmtree(BUILD_FONTS_DIR)
-        os.mkdir(BUILD_FONTS_DIR)
-    if not os.path.exists(BUILD_FONTS_DIR):
-        os.mkdir(BUILD_FONTS_DIR)
-
-    generate_font("Regular", f"{REG_WEIGHT}-Regular", "Regular")
-    generate_font("Bold", f"{BOLD_WEIGHT}-Regular", "Bold")
-    generate_font("Regular", f"{REG_WEIGHT}-Italic", "Italic", italic=True)
-    generate_font("Bold", f"{BOLD_WEIGHT}-Italic", "BoldItalic", italic=True)
-
-
-def get_options():
-    """オプション取得"""
 
-    global options, REG_WEIGHT, BOLD_WEIGHT, OS2_ASCENT, OS2_DESCENT, OS2_LINEGAP
-
-    # オプションなしの場合は何もしない
-    args = sys.argv[1:]
-    if len(args) == 0:
-        return
+def build(config: BuildConfig):
+    """設定に従って全スタイルのフォントを生成する"""
+    # buildディレクトリ作成
+    if os.path.exists(config.build_fonts_dir) and not config.do_not_delete_build_dir:
+        shutil.rmtree(config.build_fonts_dir)
+        os.mkdir(config.build_fonts_dir)
+    if not os.path.exists(config.build_fonts_dir):
+        os.mkdir(config.build_fonts_dir)
+
+    # 複数ウェイト指定時は日本語フォントを1回だけ処理し、各ウェイトの欧文フォントと組み合わせる
+    # (eng_style, OS/2 ウェイト, バリアント名に付けるウェイト文字列)
+    weights = config.weights or ((config.reg_weight, config.bold_weight),)
+    weight_strs = [f"W{reg}B{bold}" if config.weights else "" for reg, bold in weights]
+    regular_styles = [(reg, w) for (reg, _), w in zip(weights, weight_strs)]
+    bold_styles = [(bold, w) for (_, bold), w in zip(weights, weight_strs)]
+    generate_font(config, "Regular", [(f"{n}-Regular", n, w) for n, w in regular_styles], "Regular")
+    generate_font(config, "Bold", [(f"{n}-Regular", n, w) for n, w in bold_styles], "Bold")
+    generate_font(config, "Regular", [(f"{n}-Italic", n, w) for n, w in regular_styles], "Italic", italic=True)
+    generate_font(config, "Bold", [(f"{n}-Italic", n, w) for n, w in bold_styles], "BoldItalic", italic=True)
+
+
+def get_options(args: list, config: BuildConfig):
+    """オプション取得。不明なオプションがあれば None を返す"""
+    changes = {}
+    line_height = None
 
     i = 0
     while i < len(args):
         arg = args[i]
         if arg == "--do-not-delete-build-dir":
-            options["do-not-delete-build-dir"] = True
+            changes["do_not_delete_build_dir"] = True
         elif arg == "--invisible-zenkaku-space":
-            options["invisible-zenkaku-space"] = True
+            changes["invisible_zenkaku_space"] = True
         elif arg == "--half-width":
-            options["half-width"] = True
+            changes["half_width"] = True
         elif arg == "--jpdoc":
-            options["jpdoc"] = True
+            changes["jpdoc"] = True
         elif arg == "--nerd-font":
-            options["nerd-font"] = True
+            changes["nerd_font"] = True
+        elif arg == "--nerd-font-sets":
+            # 指定したアイコンセットのみ追加する (--nerd-font を兼ねる)
+            if i + 1 < len(args):
+                names = [name.strip() for name in args[i + 1].split(",") if name.strip()]
+                unknown_names = [name for name in names if name not in NERD_FONT_SETS]
+                if unknown_names:
+                    print(f"Unknown nerd font sets: {', '.join(unknown_names)}")
+                    return None
+                if names:
+                    changes["nerd_font"] = True
+                    changes["nerd_font_sets"] = tuple(names)
+                i += 1
         elif arg == "--regular-weight":
             if i + 1 < len(args):
                 val = args[i + 1]
                 if val and val.isdigit():
-                    REG_WEIGHT = int(val)
+                    changes["reg_weight"] = int(val)
                 i += 1
         elif arg == "--bold-weight":
             if i + 1 < len(args):
                 val = args[i + 1]
                 if val and val.isdigit():
-                    BOLD_WEIGHT = int(val)
+                    changes["bold_weight"] = int(val)
+                i += 1
+        elif arg == "--weights":
+            # 例: --weights 300:600,400:700 (Regular:Bold の組を列挙)
+            if i + 1 < len(args):
+                weights = []
+                for pair in args[i + 1].split(","):
+                    reg, _, bold = pair.partition(":")
+                    if not (reg.isdigit() and bold.isdigit()):
+                        return None
+                    weights.append((int(reg), int(bold)))
+                changes["weights"] = tuple(weights)
                 i += 1
         elif arg == "--line-height":
             if i + 1 < len(args):
-                val = args[i + 1]
                 try:
-                    lh = float(val)
-                    # HackGen互換: Typo/Win両方で調整
-                    total = round(1000 * lh)
-                    OS2_LINEGAP = max(0, total - 1000 - 40)  # Typo用: 約4%少なく
-                    OS2_ASCENT = 880 + (total - 1000) // 2   # Win用: 上下に分配
-                    OS2_DESCENT = 120 + (total - 1000) - (total - 1000) // 2
+                    line_height = float(args[i + 1])
                 except ValueError:
                     pass
                 i += 1
         else:
-            options["unknown-option"] = True
-            return
+            return None
         i += 1
 
+    config = config.replace(**changes)
+    if line_height is not None:
+        config = config.with_line_height(line_height)
+    return config
+
 
 def usage():
     print(
         f"Usage: {sys.argv[0]} "
-        "[--invisible-zenkaku-space] [--half-width] [--jpdoc] [--nerd-font] [--regular-weight N] [--bold-weight N] [--line-height N]"
+        "[--invisible-zenkaku-space] [--half-width] [--jpdoc] [--nerd-font] [--nerd-font-sets SET,...] [--regular-weight N] [--bold-weight N] [--weights REG:BOLD,...] [--line-height N]"
     )
+    print(f"Nerd font sets: {', '.join(NERD_FONT_SETS)}")
+
 
+def generate_font(config: BuildConfig, jp_style, eng_styles, merged_style, italic=False):
+    """日本語フォントを1回処理し、eng_styles の各欧文フォントと組み合わせて出力する
 
-def generate_font(jp_style, eng_style, merged_style, italic=False):
+    eng_styles: (eng_style, OS/2 ウェイト, バリアント名に付けるウェイト文字列) のリスト
+    """
     print(f"=== Generate {merged_style} ===")
 
-    jp_font, eng_font = open_fonts(jp_style, eng_style)
+    jp_font, eng_font = open_fonts(config, jp_style, eng_styles[0][0])
+    eng_fonts = [eng_font] + [
+        open_eng_font(config, eng_style) for eng_style, _, _ in eng_styles[1:]
+    ]
 
     # jpdoc: 日本語記号を使用
-    if options.get("jpdoc"):
-        remove_jpdoc_symbols(eng_font)
-        adjust_box_drawing_symbols(jp_font)
+    if config.jpdoc:
+        for font in eng_fonts:
+            remove_jpdoc_symbols(config, font)
+        adjust_box_drawing_symbols(config, jp_font)
     else:
-        adjust_box_drawing_symbols(eng_font)
+        for font in eng_fonts:
+            adjust_box_drawing_symbols(config, font)
 
-    delete_duplicate_glyphs(jp_font, eng_font)
-    em_1000(jp_font)
+    delete_duplicate_glyphs(jp_font, eng_fonts)
+    em_1000(config, jp_font)
     adjust_some_glyph(jp_font)
 
     if italic:
         transform_italic_glyphs(jp_font)
 
-    width_600_or_1000(jp_font)
+    width_600_or_1000(config, jp_font)
 
     # 1:2幅に変換
-    if options.get("half-width"):
-        transform_half_width(jp_font, eng_font)
+    if config.half_width:
+        transform_half_width(config, jp_font, eng_fonts)
 
     # GSUB削除 (全角文字行でリガチャ解除対策)
     remove_lookups(jp_font)
 
-    if not options.get("invisible-zenkaku-space"):
-        visualize_zenkaku_space(jp_font)
+    if not config.invisible_zenkaku_space:
+        visualize_zenkaku_space(config, jp_font)
 
-    if options.get("nerd-font"):
-        add_nerd_font_glyphs(jp_font, eng_font)
+    if config.nerd_font:
+        add_nerd_font_glyphs(config, jp_font, eng_fonts)
 
     # バリアント名生成
-    variant = HALF_WIDTH_STR if options.get("half-width") else FULL_WIDTH_35_STR
-    variant += INVISIBLE_ZENKAKU_SPACE_STR if options.get("invisible-zenkaku-space") else ""
-    variant += JPDOC_STR if options.get("jpdoc") else ""
-    variant += NERD_FONTS_STR if options.get("nerd-font") else ""
+    variant = config.variant
 
-    edit_meta_data(eng_font, merged_style, variant)
-    edit_meta_data(jp_font, merged_style, variant)
+    for eng_font, (_, os2_weight, weight_str) in zip(eng_fonts, eng_styles):
+        edit_meta_data(config, eng_font, merged_style, variant + weight_str, os2_weight)
+        edit_meta_data(config, jp_font, merged_style, variant + weight_str, os2_weight)
 
-    # 保存
-    generate_filename_part = f"{BUILD_FONTS_DIR}/{FONTFORGE_PREFIX}{FONT_NAME.replace(' ', '')}{variant}-{merged_style}"
-    eng_font.generate(f"{generate_filename_part}-eng.ttf")
-    jp_font.generate(f"{generate_filename_part}-jp.ttf")
+        # 保存
+        generate_filename_part = f"{config.build_fonts_dir}/{config.fontforge_prefix}{config.compact_font_name}{variant}{weight_str}-{merged_style}"
+        eng_font.generate(f"{generate_filename_part}-eng.ttf")
+        jp_font.generate(f"{generate_filename_part}-jp.ttf")
+        eng_font.close()
 
     jp_font.close()
-    eng_font.close()
 
 
-def open_fonts(jp_style: str, eng_style: str):
+def open_fonts(config: BuildConfig, jp_style: str, eng_style: str):
     """フォントを開く"""
     jp_font = fontforge.open(
-        f"{SOURCE_FONTS_DIR}/{JP_FONT.replace('{style}', jp_style)}"
-    )
-    eng_font = fontforge.open(
-        f"{SOURCE_FONTS_DIR}/{ENG_FONT.replace('{style}', eng_style)}"
+        f"{config.source_fonts_dir}/{config.jp_font.replace('{style}', jp_style)}"
     )
+    eng_font = open_eng_font(config, eng_style)
 
-    jp_font = altuni_to_entity(jp_font)
+    jp_font = altuni_to_entity(config, jp_font)
     jp_font.unlinkReferences()
-    eng_font.unlinkReferences()
     return jp_font, eng_font
 
 
-def altuni_to_entity(jp_font):
+def open_eng_font(config: BuildConfig, eng_style: str):
+    """欧文フォントを開く。可変フォントからインスタンス化した .ttf があればそれを使う"""
+    eng_font_path = f"{config.source_fonts_dir}/{config.eng_font.replace('{style}', eng_style)}"
+    if not os.path.exists(eng_font_path):
+        eng_font_path = os.path.splitext(eng_font_path)[0] + ".ttf"
+    eng_font = fontforge.open(eng_font_path)
+    eng_font.unlinkReferences()
+    return eng_font
+
+
+def altuni_to_entity(config: BuildConfig, jp_font):
     """透過参照を実体グリフに変換"""
     for glyph in jp_font.glyphs():
         if glyph.altuni is not None:
@@ -227,11 +260,12 @@ def altuni_to_entity(jp_font):
                     jp_font.paste()
                 before_altuni = ",".join(map(str, altuni))
     # エンコーディング整理のため開き直す
-    font_path = f"{BUILD_FONTS_DIR}/{jp_font.fullname}_{uuid.uuid4()}.ttf"
-    jp_font.generate(font_path)
-    jp_font.close()
-    reopen_jp_font = fontforge.open(font_path)
-    os.remove(font_path)
+    # 一時ファイル名に乱数を含めないよう、専用の一時ディレクトリ内で固定名を使う
+    with tempfile.TemporaryDirectory(dir=config.build_fonts_dir) as temp_dir:
+        font_path = f"{temp_dir}/{jp_font.fontname}.ttf"
+        jp_font.generate(font_path)
+        jp_font.close()
+        reopen_jp_font = fontforge.open(font_path)
     return reopen_jp_font
 
 
@@ -249,30 +283,39 @@ def adjust_some_glyph(jp_font):
         glyph.width = full_width
 
 
-def em_1000(font):
+def em_1000(config: BuildConfig, font):
     """フォントのEMを1000に変換"""
-    font.em = EM_ASCENT + EM_DESCENT
+    font.em = config.em_ascent + config.em_descent
+
 
+def delete_duplicate_glyphs(jp_font, eng_fonts):
+    """jp_fontとeng_fontsのグリフを比較し、重複するグリフを削除する
 
-def delete_duplicate_glyphs(jp_font, eng_font):
-    """jp_fontとeng_fontのグリフを比較し、重複するグリフを削除する"""
+    ウェイトごとに remove_jpdoc_symbols で削除される欧文グリフが異なる場合があるため、
+    全ウェイトの欧文フォントに残っているグリフのみ jp_font から削除する
+    """
 
-    eng_font.selection.none()
     jp_font.selection.none()
 
-    for glyph in jp_font.glyphs("encoding"):
-        try:
-            if glyph.isWorthOutputting() and glyph.unicode > 0:
-                eng_font.selection.select(("more", "unicode"), glyph.unicode)
-        except ValueError:
-            continue
-    for glyph in eng_font.selection.byGlyphs:
-        jp_font.selection.select(("more", "unicode"), glyph.unicode)
+    common_unicodes = None
+    for eng_font in eng_fonts:
+        eng_font.selection.none()
+        for glyph in jp_font.glyphs("encoding"):
+            try:
+                if glyph.isWorthOutputting() and glyph.unicode > 0:
+                    eng_font.selection.select(("more", "unicode"), glyph.unicode)
+            except ValueError:
+                continue
+        unicodes = {glyph.unicode for glyph in eng_font.selection.byGlyphs if glyph.unicode > 0}
+        eng_font.selection.none()
+        common_unicodes = unicodes if common_unicodes is None else common_unicodes & unicodes
+
+    for unicode in sorted(common_unicodes):
+        jp_font.selection.select(("more", "unicode"), unicode)
     for glyph in jp_font.selection.byGlyphs:
         glyph.clear()
 
     jp_font.selection.none()
-    eng_font.selection.none()
 
 
 def remove_lookups(font):
@@ -289,21 +332,11 @@ def transform_italic_glyphs(font):
         glyph.transform(psMat.skew(ITALIC_SLOPE * math.pi / 180))
 
 
-def remove_jpdoc_symbols(eng_font):
+def remove_jpdoc_symbols(config: BuildConfig, eng_font):
     """日本語記号を削除"""
-    limit_top = OS2_ASCENT
-    limit_bottom = -OS2_DESCENT
-
-    ranges = [
-        (0x00A7, 0x00A7), (0x00B1, 0x00B1), (0x00B6, 0x00B6), (0x00F7, 0x00F7), (0x00D7, 0x00D7),
-        (0x21D2, 0x21D2), (0x21D4, 0x21D4), (0x25A0, 0x25A1), (0x25B2, 0x25B3), (0x25BC, 0x25BD),
-        (0x25C6, 0x25C7), (0x25CB, 0x25CB), (0x25CE, 0x25CF), (0x25E5, 0x25E5), (0x25EF, 0x25EF),
-        (0x221A, 0x221A), (0x221E, 0x221E), (0x2010, 0x2010), (0x2018, 0x201A), (0x201C, 0x201E),
-        (0x2020, 0x2021), (0x2026, 0x2026), (0x2030, 0x2030), (0x2190, 0x2193), (0x2200, 0x2200),
-        (0x2202, 0x2203), (0x2208, 0x2208), (0x220B, 0x220B), (0x2211, 0x2211), (0x2225, 0x2225),
-        (0x2227, 0x222C), (0x2260, 0x2261), (0x2282, 0x2283), (0x2286, 0x2287), (0x2500, 0x259F)
-    ]
-    
+    limit_top = config.os2_ascent
+    limit_bottom = -config.os2_descent
+
     count = 0
     for glyph in eng_font.glyphs():
         u = glyph.unicode
@@ -315,7 +348,7 @@ def remove_jpdoc_symbols(eng_font):
             should_remove = True
         
         if not should_remove and u != -1:
-            for start, end in ranges:
+            for start, end in JPDOC_SYMBOL_RANGES:
                 if start <= u <= end:
                     should_remove = True
                     break
@@ -330,17 +363,17 @@ def remove_jpdoc_symbols(eng_font):
             count += 1
 
 
-def adjust_box_drawing_symbols(font):
+def adjust_box_drawing_symbols(config: BuildConfig, font):
     """罫線を行間に延伸"""
     font.selection.none()
     font.selection.select(("ranges",), 0x2500, 0x259F)
 
     # 延長の目標座標 (Win/hhea高さに一致)
-    TARGET_TOP = OS2_ASCENT
-    TARGET_BOTTOM = -OS2_DESCENT
+    TARGET_TOP = config.os2_ascent
+    TARGET_BOTTOM = -config.os2_descent
     # 延長対象判定の閾値 (EM境界より少し内側)
-    THRESHOLD_TOP = EM_ASCENT - 100  # 780
-    THRESHOLD_BOTTOM = -EM_DESCENT + 100  # -20
+    THRESHOLD_TOP = config.em_ascent - 100  # 780
+    THRESHOLD_BOTTOM = -config.em_descent + 100  # -20
     THRESHOLD_X_LEFT = 200
     THRESHOLD_X_RIGHT_MARGIN = 200
 
@@ -377,10 +410,10 @@ def adjust_box_drawing_symbols(font):
     font.selection.none()
 
 
-def width_600_or_1000(jp_font):
+def width_600_or_1000(config: BuildConfig, jp_font):
     """幅を600または1000に統一"""
-    half_width = HALF_WIDTH_35
-    full_width = FULL_WIDTH_35
+    half_width = config.half_width_35
+    full_width = config.full_width_35
     for glyph in jp_font.glyphs():
         if 0 < glyph.width <= half_width + 20:
             glyph.transform(psMat.translate((half_width - glyph.width) / 2, 0))
@@ -390,35 +423,36 @@ def width_600_or_1000(jp_font):
             glyph.width = full_width
 
 
-def transform_half_width(jp_font, eng_font):
+def transform_half_width(config: BuildConfig, jp_font, eng_fonts):
     """幅を1:2比に変換"""
-    before_width_eng = eng_font[0x0030].width
-    after_width_eng = HALF_WIDTH_12
-    x_scale = 540 / before_width_eng
-    for glyph in eng_font.glyphs():
-        if glyph.width > 0:
-            after_width_eng_multiply = after_width_eng * round(glyph.width / HALF_WIDTH_35)
-            glyph.transform(psMat.scale(x_scale, 1))
-            glyph.transform(
-                psMat.translate((after_width_eng_multiply - glyph.width) / 2, 0)
-            )
-            glyph.width = after_width_eng_multiply
+    after_width_eng = config.half_width_12
+    for eng_font in eng_fonts:
+        before_width_eng = eng_font[0x0030].width
+        x_scale = 540 / before_width_eng
+        for glyph in eng_font.glyphs():
+            if glyph.width > 0:
+                after_width_eng_multiply = after_width_eng * round(glyph.width / config.half_width_35)
+                glyph.transform(psMat.scale(x_scale, 1))
+                glyph.transform(
+                    psMat.translate((after_width_eng_multiply - glyph.width) / 2, 0)
+                )
+                glyph.width = after_width_eng_multiply
 
     for glyph in jp_font.glyphs():
-        if glyph.width == HALF_WIDTH_35:
+        if glyph.width == config.half_width_35:
             glyph.transform(psMat.translate((after_width_eng - glyph.width) / 2, 0))
             glyph.width = after_width_eng
-        elif glyph.width == FULL_WIDTH_35:
+        elif glyph.width == config.full_width_35:
             glyph.transform(psMat.translate((after_width_eng * 2 - glyph.width) / 2, 0))
             glyph.width = after_width_eng * 2
 
 
-def visualize_zenkaku_space(jp_font):
+def visualize_zenkaku_space(config: BuildConfig, jp_font):
     """全角スペース可視化"""
     glyph = jp_font[0x3000]
     width_to = glyph.width
     glyph.clear()
-    jp_font.mergeFonts(fontforge.open(f"{SOURCE_FONTS_DIR}/{IDEOGRAPHIC_SPACE}"))
+    jp_font.mergeFonts(fontforge.open(f"{config.source_fonts_dir}/{config.ideographic_space}"))
     jp_font.selection.select("U+3000")
     for glyph in jp_font.selection.byGlyphs:
         width_from = glyph.width
@@ -427,52 +461,10 @@ def visualize_zenkaku_space(jp_font):
     jp_font.selection.none()
 
 
-def add_nerd_font_glyphs(jp_font, eng_font):
+def add_nerd_font_glyphs(config: BuildConfig, jp_font, eng_fonts):
     """ネードフォントグリフ追加"""
-    global nerd_font
-    if nerd_font is None:
-        nerd_font = fontforge.open(
-            f"{SOURCE_FONTS_DIR}/nerd-fonts/SymbolsNerdFont-Regular.ttf"
-        )
-        nerd_font.em = EM_ASCENT + EM_DESCENT
-        glyph_names = set()
-        for nerd_glyph in nerd_font.glyphs():
-            # グリフ名重複対策
-            if nerd_glyph.glyphname in glyph_names:
-                nerd_glyph.glyphname = f"{nerd_glyph.glyphname}-{nerd_glyph.encoding}"
-            glyph_names.add(nerd_glyph.glyphname)
-            half_width = eng_font[0x0030].width
-            if 0xE0B0 <= nerd_glyph.unicode <= 0xE0D4:
-                # 右付きグリフの位置調整
-                original_width = nerd_glyph.width
-                if nerd_glyph.unicode == 0xE0B2:
-                    nerd_glyph.transform(psMat.translate(-353, 0))
-                elif nerd_glyph.unicode == 0xE0B6:
-                    nerd_glyph.transform(psMat.translate(-414, 0))
-                elif nerd_glyph.unicode == 0xE0C5:
-                    nerd_glyph.transform(psMat.translate(-137, 0))
-                elif nerd_glyph.unicode == 0xE0C7:
-                    nerd_glyph.transform(psMat.translate(-214, 0))
-                elif nerd_glyph.unicode == 0xE0D4:
-                    nerd_glyph.transform(psMat.translate(-314, 0))
-                nerd_glyph.width = original_width
-                if nerd_glyph.width < half_width:
-                    nerd_glyph.transform(
-                        psMat.translate((half_width - nerd_glyph.width) / 2, 0)
-                    )
-                elif nerd_glyph.width > half_width:
-                    nerd_glyph.transform(psMat.scale(half_width / nerd_glyph.width, 1))
-                # 行高さに合わせてスケーリング (Win/hhea高さ / EM)
-                line_height_scale = (OS2_ASCENT + OS2_DESCENT) / (EM_ASCENT + EM_DESCENT)
-                nerd_glyph.transform(psMat.scale(1, line_height_scale))
-                # 上下中央揃え調整
-                vertical_shift = (OS2_DESCENT - EM_DESCENT) - (OS2_ASCENT - EM_ASCENT)
-                nerd_glyph.transform(psMat.translate(0, vertical_shift / 2))
-            elif nerd_glyph.width < HALF_WIDTH_35:
-                nerd_glyph.transform(
-                    psMat.translate((half_width - nerd_glyph.width) / 2, 0)
-                )
-            nerd_glyph.width = half_width
+    nerd_font = load_nerd_font(config, eng_fonts[0][0x0030].width)
+
     # 既存グリフ削除後マージ
     for nerd_glyph in nerd_font.glyphs():
         if nerd_glyph.unicode != -1:
@@ -480,36 +472,121 @@ def add_nerd_font_glyphs(jp_font, eng_font):
                 jp_font[nerd_glyph.unicode].clear()
             except (TypeError, KeyError):
                 pass
-            try:
-                eng_font[nerd_glyph.unicode].clear()
-            except (TypeError, KeyError):
-                pass
+            for eng_font in eng_fonts:
+                try:
+                    eng_font[nerd_glyph.unicode].clear()
+                except (TypeError, KeyError):
+                    pass
     jp_font.mergeFonts(nerd_font)
 
 
-def edit_meta_data(font, weight: str, variant: str):
+def load_nerd_font(config: BuildConfig, half_width: int):
+    """幅・高さを調整した Nerd Fonts を開く (同じ設定では使い回す)"""
+    cache_key = (
+        config.source_fonts_dir,
+        config.nerd_font_sets,
+        config.em_ascent,
+        config.em_descent,
+        config.os2_ascent,
+        config.os2_descent,
+        config.half_width_35,
+        half_width,
+    )
+    with nerd_font_lock:
+        if cache_key not in nerd_font_cache:
+            nerd_font_cache[cache_key] = open_nerd_font(config, half_width)
+        return nerd_font_cache[cache_key]
+
+
+def open_nerd_font(config: BuildConfig, half_width: int):
+    """Nerd Fonts を開き、幅・高さを調整する"""
+    nerd_font = fontforge.open(
+        f"{config.source_fonts_dir}/nerd-fonts/SymbolsNerdFont-Regular.ttf"
+    )
+    if config.nerd_font_sets:
+        remove_unselected_nerd_glyphs(nerd_font, config.nerd_font_sets)
+    nerd_font.em = config.em_ascent + config.em_descent
+    glyph_names = set()
+    for nerd_glyph in nerd_font.glyphs():
+        # グリフ名重複対策
+        if nerd_glyph.glyphname in glyph_names:
+            nerd_glyph.glyphname = f"{nerd_glyph.glyphname}-{nerd_glyph.encoding}"
+        glyph_names.add(nerd_glyph.glyphname)
+        if 0xE0B0 <= nerd_glyph.unicode <= 0xE0D4:
+            # 右付きグリフの位置調整
+            original_width = nerd_glyph.width
+            if nerd_glyph.unicode == 0xE0B2:
+                nerd_glyph.transform(psMat.translate(-353, 0))
+            elif nerd_glyph.unicode == 0xE0B6:
+                nerd_glyph.transform(psMat.translate(-414, 0))
+            elif nerd_glyph.unicode == 0xE0C5:
+                nerd_glyph.transform(psMat.translate(-137, 0))
+            elif nerd_glyph.unicode == 0xE0C7:
+                nerd_glyph.transform(psMat.translate(-214, 0))
+            elif nerd_glyph.unicode == 0xE0D4:
+                nerd_glyph.transform(psMat.translate(-314, 0))
+            nerd_glyph.width = original_width
+            if nerd_glyph.width < half_width:
+                nerd_glyph.transform(
+                    psMat.translate((half_width - nerd_glyph.width) / 2, 0)
+                )
+            elif nerd_glyph.width > half_width:
+                nerd_glyph.transform(psMat.scale(half_width / nerd_glyph.width, 1))
+            # 行高さに合わせてスケーリング (Win/hhea高さ / EM)
+            line_height_scale = (config.os2_ascent + config.os2_descent) / (
+                config.em_ascent + config.em_descent
+            )
+            nerd_glyph.transform(psMat.scale(1, line_height_scale))
+            # 上下中央揃え調整
+            vertical_shift = (config.os2_descent - config.em_descent) - (
+                config.os2_ascent - config.em_ascent
+            )
+            nerd_glyph.transform(psMat.translate(0, vertical_shift / 2))
+        elif nerd_glyph.width < config.half_width_35:
+            nerd_glyph.transform(
+                psMat.translate((half_width - nerd_glyph.width) / 2, 0)
+            )
+        nerd_glyph.width = half_width
+    return nerd_font
+
+
+def remove_unselected_nerd_glyphs(nerd_font, set_names):
+    """選択されていないアイコンセットのグリフを削除"""
+    ranges = [r for name in set_names for r in NERD_FONT_SETS[name]]
+    nerd_font.selection.none()
+    for start, end in ranges:
+        nerd_font.selection.select(("more", "ranges", "unicode"), start, end)
+    nerd_font.selection.invert()
+    for glyph in list(nerd_font.selection.byGlyphs):
+        nerd_font.removeGlyph(glyph)
+    nerd_font.selection.none()
+
+
+def edit_meta_data(
+    config: BuildConfig, font, weight: str, variant: str, os2_weight: int = None
+):
     """メタデータ編集"""
-    font.ascent = EM_ASCENT
-    font.descent = EM_DESCENT
+    font.ascent = config.em_ascent
+    font.descent = config.em_descent
 
-    font.version = VERSION
+    font.version = config.version
     try:
-        v_parts = VERSION.split('.')
+        v_parts = config.version.split('.')
         if len(v_parts) >= 2:
             font.fontRevision = float(f"{v_parts[0]}.{''.join(v_parts[1:])}")
         else:
-            font.fontRevision = float(VERSION)
+            font.fontRevision = float(config.version)
     except Exception:
         pass
 
-    font.os2_typoascent = EM_ASCENT
-    font.os2_typodescent = -EM_DESCENT
-    font.os2_typolinegap = OS2_LINEGAP
-    font.os2_winascent = OS2_ASCENT
-    font.os2_windescent = OS2_DESCENT
+    font.os2_typoascent = config.em_ascent
+    font.os2_typodescent = -config.em_descent
+    font.os2_typolinegap = config.os2_linegap
+    font.os2_winascent = config.os2_ascent
+    font.os2_windescent = config.os2_descent
 
-    font.hhea_ascent = OS2_ASCENT
-    font.hhea_descent = -OS2_DESCENT
+    font.hhea_ascent = config.os2_ascent
+    font.hhea_descent = -config.os2_descent
     font.hhea_linegap = 0
 
     font.sfnt_names = (
@@ -521,14 +598,19 @@ Version 1.1. This license is available with a FAQ
 at: http://scripts.sil.org/OFL""",
         ),
         ("English (US)", "License URL", "http://scripts.sil.org/OFL"),
-        ("English (US)", "Version", VERSION),
+        ("English (US)", "Version", config.version),
     )
-    font.familyname = f"{FONT_NAME} {variant}".strip()
-    font.fontname = f"{FONT_NAME.replace(' ', '')}{variant}-{weight}"
-    font.fullname = f"{FONT_NAME} {variant}".strip() + f" {weight}"
-    font.os2_vendor = VENDER_NAME
+    font.familyname = f"{config.font_name} {variant}".strip()
+    font.fontname = f"{config.compact_font_name}{variant}-{weight}"
+    font.fullname = f"{config.font_name} {variant}".strip() + f" {weight}"
+    font.os2_vendor = config.vender_name
     font.copyright = COPYRIGHT
 
+    # 再現可能ビルド: 作成・更新日時を SOURCE_DATE_EPOCH に固定
+    if config.source_date_epoch is not None:
+        font.creationtime = config.source_date_epoch
+        font.modificationtime = config.source_date_epoch
+
     # macstyle settings
     mac_style = 0
     if "Bold" in weight:
@@ -542,10 +624,12 @@ at: http://scripts.sil.org/OFL""",
     font.os2_fstype = 0  # Installable Embedding
     font.os2_family_class = 2057  # SS Typewriter Gothic
     
-    if "Bold" in weight:
-        font.os2_weight = BOLD_WEIGHT
+    if os2_weight is not None:
+        font.os2_weight = os2_weight
+    elif "Bold" in weight:
+        font.os2_weight = config.bold_weight
     else:
-        font.os2_weight = REG_WEIGHT
+        font.os2_weight = config.reg_weight
 
 
 if __name__ == "__main__":
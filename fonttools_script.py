@@ -1,89 +1,148 @@
 #!/bin/env python3
 
-import configparser
 import glob
 import os
 import sys
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 from pathlib import Path
 
-from fontTools import merge, ttLib, ttx
+from fontTools import merge, subset, ttLib, ttx
+from fontTools.misc.timeTools import epoch_diff, timestampToString
+from fontTools.ttLib.tables import otTables
+from fontTools.ttLib.tables._c_m_a_p import CmapSubtable
 from ttfautohint import options, ttfautohint
 
-# iniファイルを読み込む
-settings = configparser.ConfigParser()
-settings.read("build.ini", encoding="utf-8")
-
-FONT_NAME = settings.get("DEFAULT", "FONT_NAME").replace(" ", "")
-FONTFORGE_PREFIX = settings.get("DEFAULT", "FONTFORGE_PREFIX")
-FONTTOOLS_PREFIX = settings.get("DEFAULT", "FONTTOOLS_PREFIX")
-SOURCE_FONTS_DIR = os.environ.get("SOURCE_FONTS_DIR") or settings.get("DEFAULT", "SOURCE_FONTS_DIR")
-BUILD_FONTS_DIR = os.environ.get("BUILD_FONTS_DIR") or settings.get("DEFAULT", "BUILD_FONTS_DIR")
-HALF_WIDTH_STR = settings.get("DEFAULT", "HALF_WIDTH_STR")
-HALF_WIDTH_12 = int(settings.get("DEFAULT", "HALF_WIDTH_12"))
-HALF_WIDTH_35 = int(settings.get("DEFAULT", "HALF_WIDTH_35"))
-FULL_WIDTH_35 = int(settings.get("DEFAULT", "FULL_WIDTH_35"))
-EM_ASCENT = int(settings.get("DEFAULT", "EM_ASCENT"))
-EM_DESCENT = int(settings.get("DEFAULT", "EM_DESCENT"))
-OS2_ASCENT = int(settings.get("DEFAULT", "OS2_ASCENT"))
-OS2_DESCENT = int(settings.get("DEFAULT", "OS2_DESCENT"))
-OS2_LINEGAP = int(settings.get("DEFAULT", "OS2_LINEGAP"))
+from build_config import BuildConfig
+
+# Commit Mono の OpenType 機能
+# 字形切替 (cv) はアウトラインを入れ替え、スタイルセット (ss) は calt に組み込んで常時有効にする
+COMMIT_MONO_ALTERNATES = [f"cv{i:02d}" for i in range(1, 12)]
+COMMIT_MONO_FEATURES = [f"ss{i:02d}" for i in range(1, 6)]
+
+
+def jis_x_0208_kanji(first_row: int, last_row: int) -> list:
+    """JIS X 0208 の指定区に含まれる漢字のコードポイントを返す"""
+    codepoints = []
+    for row in range(first_row, last_row + 1):
+        for cell in range(1, 95):
+            try:
+                char = bytes([0xA0 + row, 0xA0 + cell]).decode("euc_jp")
+            except UnicodeDecodeError:
+                continue
+            codepoints.append(ord(char))
+    return codepoints
+
+
+def expand_ranges(ranges: list) -> frozenset:
+    """コードポイント範囲のリストを集合に展開する"""
+    return frozenset(cp for start, end in ranges for cp in range(start, end + 1))
+
+
+# Web フォントのサブセット分割範囲
+# いずれにも属さないコードポイントは "other" にまとめる
+WEB_SUBSETS = {
+    "latin": expand_ranges(
+        [
+            (0x0000, 0x024F),
+            (0x0300, 0x036F),
+            (0x2000, 0x206F),
+            (0x20A0, 0x20CF),
+            (0x2100, 0x214F),
+        ]
+    ),
+    "kana": expand_ranges([(0x3000, 0x30FF), (0x31F0, 0x31FF), (0xFF00, 0xFFEF)]),
+    # JIS 第1水準漢字 (16-47区), JIS 第2水準漢字 (48-84区)
+    "jis1": frozenset(jis_x_0208_kanji(16, 47)),
+    "jis2": frozenset(jis_x_0208_kanji(48, 84)),
+    # Nerd Fonts (BMP 私用領域, Material Design Icons)
+    "nerd": expand_ranges([(0xE000, 0xF8FF), (0xF0000, 0xF1FFF)]),
+}
+# 異体字セレクタ (IVS を含むサブセットの unicode-range に追加する)
+VARIATION_SELECTORS = expand_ranges([(0xFE00, 0xFE0F), (0xE0100, 0xE01EF)])
 
 
 def main():
-    # 第一引数を取得
-    # 特定のバリエーションのみを処理するための指定
-    specific_variant = None
+    config = get_options(sys.argv[1:], BuildConfig.load())
+    if config.derive_ligature:
+        derive_ligature_fonts(config)
+    else:
+        edit_fonts(config)
+
+
+def get_options(args: list, config: BuildConfig) -> BuildConfig:
+    """オプション取得"""
+    changes = {}
     line_height = None
 
-    for arg in sys.argv[1:]:
+    for arg in args:
         if arg.startswith("--line-height="):
             line_height = float(arg.split("=")[1])
+        elif arg.startswith("--features="):
+            # 例: --features=ss03,ss04,ss05,cv01
+            features = [f.strip() for f in arg.split("=")[1].split(",") if f.strip()]
+            unknown_features = [
+                f for f in features if f not in COMMIT_MONO_ALTERNATES + COMMIT_MONO_FEATURES
+            ]
+            if unknown_features:
+                print(f"Error: unknown features {', '.join(unknown_features)}")
+                sys.exit(1)
+            changes["features"] = tuple(features)
+        elif arg == "--woff2":
+            changes["woff2"] = True
+        elif arg == "--web-subset":
+            # サブセット分割は WOFF2 出力を伴う
+            changes["woff2"] = True
+            changes["web_subset"] = True
+        elif arg == "--derive-ligature":
+            changes["derive_ligature"] = True
         else:
-            specific_variant = arg
+            # 特定のバリエーションのみを処理するための指定
+            changes["specific_variant"] = arg
 
-    edit_fonts(specific_variant, line_height)
+    config = config.replace(**changes)
+    if line_height is not None:
+        config = config.with_line_height(line_height)
+    return config
 
 
-def edit_fonts(specific_variant: str, line_height: float = None):
+def edit_fonts(config: BuildConfig):
     """フォントを編集する"""
-
-    global OS2_ASCENT, OS2_DESCENT, OS2_LINEGAP
-    if line_height is not None:
-        # HackGen互換: 行高さを Typo/Win 両方で調整
-        # line_height=1.12 → Typo=1.08 EM, Win=1.12 EM (HackGenと同等)
-        total = round(1000 * line_height)
-        OS2_LINEGAP = max(0, total - 1000 - 40)  # Typo用: 約4%少なく
-        OS2_ASCENT = 880 + (total - 1000) // 2   # Win用: 上下に分配
-        OS2_DESCENT = 120 + (total - 1000) - (total - 1000) // 2
-
-    if specific_variant is None:
-        specific_variant = ""
+    font_name = config.compact_font_name
+    build_dir = config.build_fonts_dir
+    specific_variant = config.specific_variant
 
     # ファイルをパターンで指定
-    file_pattern = f"{FONTFORGE_PREFIX}{FONT_NAME}{specific_variant}*-eng.ttf"
-    filenames = glob.glob(f"{BUILD_FONTS_DIR}/{file_pattern}")
+    file_pattern = f"{config.fontforge_prefix}{font_name}{specific_variant}*-eng.ttf"
+    filenames = glob.glob(f"{build_dir}/{file_pattern}")
     # ファイルが見つからない場合はエラー
     if len(filenames) == 0:
         print(f"Error: {file_pattern} not found")
         return
     paths = [Path(f) for f in filenames]
+    completed_paths = []
     for path in paths:
         print(f"edit {str(path)}")
         style = path.stem.split("-")[1]
-        variant = path.stem.split("-")[0].replace(f"{FONTFORGE_PREFIX}{FONT_NAME}", "")
+        variant = path.stem.split("-")[0].replace(f"{config.fontforge_prefix}{font_name}", "")
         add_hinting(str(path), str(path).replace(".ttf", "-hinted.ttf"))
-        merge_fonts(style, variant)
-        fix_font_tables(style, variant)
+        merge_fonts(config, style, variant)
+        fix_font_tables(config, style, variant)
+        completed_paths.append(f"{build_dir}/{font_name}{variant}-{style}.ttf")
+
+    # Web フォントを出力
+    if config.woff2:
+        generate_webfonts(config, completed_paths)
 
     # 一時ファイルを削除
     # スタイル部分以降はワイルドカードで指定
     for filename in glob.glob(
-        f"{BUILD_FONTS_DIR}/{FONTTOOLS_PREFIX}{FONT_NAME}{specific_variant}*"
+        f"{build_dir}/{config.fonttools_prefix}{font_name}{specific_variant}*"
     ):
         os.remove(filename)
     for filename in glob.glob(
-        f"{BUILD_FONTS_DIR}/{FONTFORGE_PREFIX}{FONT_NAME}{specific_variant}*"
+        f"{build_dir}/{config.fontforge_prefix}{font_name}{specific_variant}*"
     ):
         os.remove(filename)
 
@@ -112,12 +171,12 @@ def add_hinting(input_font_path, output_font_path):
     ttfautohint(**options_)
 
 
-def merge_fonts(style, variant):
+def merge_fonts(config: BuildConfig, style, variant):
     """フォントを結合する"""
-    eng_font_path = f"{BUILD_FONTS_DIR}/{FONTFORGE_PREFIX}{FONT_NAME}{variant}-{style}-eng-hinted.ttf"
-    jp_font_path = (
-        f"{BUILD_FONTS_DIR}/{FONTFORGE_PREFIX}{FONT_NAME}{variant}-{style}-jp.ttf"
-    )
+    font_name = config.compact_font_name
+    build_dir = config.build_fonts_dir
+    eng_font_path = f"{build_dir}/{config.fontforge_prefix}{font_name}{variant}-{style}-eng-hinted.ttf"
+    jp_font_path = f"{build_dir}/{config.fontforge_prefix}{font_name}{variant}-{style}-jp.ttf"
 
     # vhea, vmtxテーブルを削除
     jp_font_object = ttLib.TTFont(jp_font_path)
@@ -126,37 +185,202 @@ def merge_fonts(style, variant):
     if "vmtx" in jp_font_object:
         del jp_font_object["vmtx"]
     jp_font_object.save(jp_font_path)
+
+    # Commit Mono の機能をメモリ上で適用
+    eng_font = eng_font_path
+    if config.features is not None:
+        eng_font_object = ttLib.TTFont(eng_font_path)
+        freeze_features(eng_font_object, config.features)
+        eng_font = BytesIO()
+        eng_font_object.save(eng_font)
+        eng_font.seek(0)
+
     # フォントを結合
     merger = merge.Merger()
-    merged_font = merger.merge([eng_font_path, jp_font_path])
+    merged_font = merger.merge([eng_font, jp_font_path])
     merged_font.save(
-        f"{BUILD_FONTS_DIR}/{FONTTOOLS_PREFIX}{FONT_NAME}{variant}-{style}_merged.ttf"
+        f"{build_dir}/{config.fonttools_prefix}{font_name}{variant}-{style}_merged.ttf"
     )
 
 
-def fix_font_tables(style, variant):
+def freeze_features(font: ttLib.TTFont, features: list):
+    """Commit Mono の字形切替 (cv) とスタイルセット (ss) を適用する"""
+    gsub = font["GSUB"].table
+
+    # 字形切替: 代替グリフとアウトラインを入れ替える
+    alternates = [f for f in features if f in COMMIT_MONO_ALTERNATES]
+    for tag in reversed(alternates):
+        for lookup_index in feature_lookup_indices(gsub, tag):
+            for subtable in gsub.LookupList.Lookup[lookup_index].SubTable:
+                if hasattr(subtable, "ExtSubTable"):
+                    subtable = subtable.ExtSubTable
+                for original, substitute in getattr(subtable, "mapping", {}).items():
+                    swap_glyph_outlines(font, original, substitute)
+
+    # スタイルセット: calt のルックアップとして常時有効にする
+    calt_lookup_indices = []
+    for tag in [f for f in features if f in COMMIT_MONO_FEATURES]:
+        calt_lookup_indices += feature_lookup_indices(gsub, tag)
+    set_calt_lookups(gsub, calt_lookup_indices)
+
+
+def feature_lookup_indices(gsub, tag: str) -> list:
+    """指定した機能タグが参照するルックアップ番号を返す"""
+    lookup_indices = []
+    for feature_record in gsub.FeatureList.FeatureRecord:
+        if feature_record.FeatureTag != tag:
+            continue
+        for lookup_index in feature_record.Feature.LookupListIndex:
+            if lookup_index not in lookup_indices:
+                lookup_indices.append(lookup_index)
+    return lookup_indices
+
+
+def set_calt_lookups(gsub, lookup_indices: list):
+    """calt のルックアップを置き換える。calt が無ければ全言語システムに追加する"""
+    calt_records = [r for r in gsub.FeatureList.FeatureRecord if r.FeatureTag == "calt"]
+    if len(calt_records) == 0:
+        feature = otTables.Feature()
+        feature.FeatureParams = None
+        feature_record = otTables.FeatureRecord()
+        feature_record.FeatureTag = "calt"
+        feature_record.Feature = feature
+        gsub.FeatureList.FeatureRecord.append(feature_record)
+        gsub.FeatureList.FeatureCount = len(gsub.FeatureList.FeatureRecord)
+        feature_index = gsub.FeatureList.FeatureCount - 1
+        for script_record in gsub.ScriptList.ScriptRecord:
+            script = script_record.Script
+            lang_systems = [r.LangSys for r in script.LangSysRecord]
+            if script.DefaultLangSys is not None:
+                lang_systems.append(script.DefaultLangSys)
+            for lang_sys in lang_systems:
+                lang_sys.FeatureIndex.append(feature_index)
+                lang_sys.FeatureCount = len(lang_sys.FeatureIndex)
+        calt_records = [feature_record]
+
+    for feature_record in calt_records:
+        feature_record.Feature.LookupListIndex = list(lookup_indices)
+        feature_record.Feature.LookupCount = len(lookup_indices)
+
+
+def swap_glyph_outlines(font: ttLib.TTFont, glyph_name_a: str, glyph_name_b: str):
+    """2つのグリフのアウトラインを入れ替える (送り幅はそのまま)"""
+    glyf = font["glyf"]
+    hmtx = font["hmtx"]
+    glyf[glyph_name_a], glyf[glyph_name_b] = glyf[glyph_name_b], glyf[glyph_name_a]
+    (width_a, lsb_a), (width_b, lsb_b) = hmtx[glyph_name_a], hmtx[glyph_name_b]
+    hmtx[glyph_name_a] = (width_a, lsb_b)
+    hmtx[glyph_name_b] = (width_b, lsb_a)
+
+
+def derive_ligature_fonts(config: BuildConfig):
+    """完成したフォントの calt を差し替え、名前を変えて Lig バリアントを作る
+
+    スタイルセットのルックアップとグリフは完成したフォントにも残っているため、
+    FontForge からのビルドをやり直す必要はない。
+    """
+    font_name = config.compact_font_name
+    build_dir = config.build_fonts_dir
+
+    file_pattern = f"{font_name}{config.specific_variant}*-*.ttf"
+    filenames = sorted(glob.glob(f"{build_dir}/{file_pattern}"))
+    if len(filenames) == 0:
+        print(f"Error: {file_pattern} not found")
+        return
+
+    derived_paths = []
+    for filename in filenames:
+        variant, style = Path(filename).stem[len(font_name) :].rsplit("-", 1)
+        ligature_variant = get_ligature_variant(config, variant)
+        if ligature_variant is None:
+            continue
+        derived_path = f"{build_dir}/{font_name}{ligature_variant}-{style}.ttf"
+        print(f"derive {derived_path}")
+        derive_ligature_font(config, filename, derived_path, variant, ligature_variant)
+        derived_paths.append(derived_path)
+
+    # Web フォントを出力
+    if config.woff2:
+        generate_webfonts(config, derived_paths)
+
+
+def get_ligature_variant(config: BuildConfig, variant: str) -> str:
+    """幅の文字列の直後に LIGATURE_STR を入れたバリアント名を返す。Lig バリアントなら None"""
+    # 長い方から照合する (HALF_WIDTH_STR は空文字の場合がある)
+    for width_str in sorted({config.full_width_35_str, config.half_width_str}, key=len, reverse=True):
+        if variant.startswith(width_str):
+            rest = variant[len(width_str) :]
+            if rest.startswith(config.ligature_str):
+                return None
+            return f"{width_str}{config.ligature_str}{rest}"
+    return None
+
+
+def derive_ligature_font(
+    config: BuildConfig, input_path: str, output_path: str, variant: str, ligature_variant: str
+):
+    """1つのフォントから Lig バリアントを作る"""
+    font = ttLib.TTFont(input_path)
+
+    # スタイルセットを calt に組み込み直す
+    # 字形切替 (cv) は元フォントで適用済みのため、ss のみ差し替える
+    features = config.features if config.features is not None else COMMIT_MONO_FEATURES
+    gsub = font["GSUB"].table
+    calt_lookup_indices = []
+    for tag in [f for f in features if f in COMMIT_MONO_FEATURES]:
+        lookup_indices = feature_lookup_indices(gsub, tag)
+        if len(lookup_indices) == 0:
+            raise ValueError(f"{tag} not found in {input_path}")
+        calt_lookup_indices += lookup_indices
+    set_calt_lookups(gsub, calt_lookup_indices)
+
+    # 名前を Lig バリアントのものに置き換える
+    font_name = config.compact_font_name
+    replacements = [
+        (f"{config.font_name} {variant}".strip(), f"{config.font_name} {ligature_variant}".strip()),
+        (f"{font_name}{variant}-", f"{font_name}{ligature_variant}-"),
+    ]
+    for record in font["name"].names:
+        string = record.toUnicode()
+        for old, new in replacements:
+            string = string.replace(old, new)
+        record.string = string
+
+    font.save(output_path)
+
+
+def fix_font_tables(config: BuildConfig, style, variant):
     """フォントテーブルを編集する"""
+    font_name = config.compact_font_name
+    build_dir = config.build_fonts_dir
 
-    input_font_name = f"{FONTTOOLS_PREFIX}{FONT_NAME}{variant}-{style}_merged.ttf"
-    output_name_base = f"{FONTTOOLS_PREFIX}{FONT_NAME}{variant}-{style}"
-    completed_name_base = f"{FONT_NAME}{variant}-{style}"
+    input_font_name = f"{config.fonttools_prefix}{font_name}{variant}-{style}_merged.ttf"
+    output_name_base = f"{config.fonttools_prefix}{font_name}{variant}-{style}"
+    completed_name_base = f"{font_name}{variant}-{style}"
 
     # OS/2, post, hhea, cmap, head テーブルのttxファイルを出力
-    xml = dump_ttx(input_font_name, output_name_base)
+    xml = dump_ttx(config, input_font_name, output_name_base)
     # head テーブルを編集
-    fix_head_table(xml, style)
+    fix_head_table(config, xml, style)
     # OS/2 テーブルを編集
-    fix_os2_table(xml, style, flag_hw=HALF_WIDTH_STR in variant)
+    # HALF_WIDTH_STR は空文字のため、バリアント名の先頭が FULL_WIDTH_35_STR かどうかで判定する
+    fix_os2_table(
+        config,
+        xml,
+        style,
+        flag_hw=not variant.startswith(config.full_width_35_str),
+        latin_width=get_latin_width(f"{build_dir}/{input_font_name}"),
+    )
     # hhea テーブルを編集
-    fix_hhea_table(xml, style)
+    fix_hhea_table(config, xml, style)
     # post テーブルを編集
     fix_post_table(xml)
     # cmap テーブルを編集
-    fix_cmap_table(xml, style, variant)
+    fix_cmap_table(config, xml, style, variant)
 
     # ttxファイルを上書き保存
     xml.write(
-        f"{BUILD_FONTS_DIR}/{output_name_base}.ttx",
+        f"{build_dir}/{output_name_base}.ttx",
         encoding="utf-8",
         xml_declaration=True,
     )
@@ -165,22 +389,26 @@ def fix_font_tables(style, variant):
     ttx.main(
         [
             "-o",
-            f"{BUILD_FONTS_DIR}/{output_name_base}_os2_post.ttf",
+            f"{build_dir}/{output_name_base}_os2_post.ttf",
             "-m",
-            f"{BUILD_FONTS_DIR}/{input_font_name}",
-            f"{BUILD_FONTS_DIR}/{output_name_base}.ttx",
+            f"{build_dir}/{input_font_name}",
+            f"{build_dir}/{output_name_base}.ttx",
         ]
     )
 
+    # cmap を最終グリフセットから再構築
+    optimize_cmap(f"{build_dir}/{output_name_base}_os2_post.ttf")
+
     # ファイル名を変更
     os.rename(
-        f"{BUILD_FONTS_DIR}/{output_name_base}_os2_post.ttf",
-        f"{BUILD_FONTS_DIR}/{completed_name_base}.ttf",
+        f"{build_dir}/{output_name_base}_os2_post.ttf",
+        f"{build_dir}/{completed_name_base}.ttf",
     )
 
 
-def dump_ttx(input_name_base, output_name_base) -> ET:
+def dump_ttx(config: BuildConfig, input_name_base, output_name_base) -> ET:
     """OS/2, post, hhea, cmap, head テーブルのみのttxファイルを出力"""
+    build_dir = config.build_fonts_dir
     ttx.main(
         [
             "-t",
@@ -195,16 +423,23 @@ def dump_ttx(input_name_base, output_name_base) -> ET:
             "head",
             "-f",
             "-o",
-            f"{BUILD_FONTS_DIR}/{output_name_base}.ttx",
-            f"{BUILD_FONTS_DIR}/{input_name_base}",
+            f"{build_dir}/{output_name_base}.ttx",
+            f"{build_dir}/{input_name_base}",
         ]
     )
 
-    return ET.parse(f"{BUILD_FONTS_DIR}/{output_name_base}.ttx")
+    return ET.parse(f"{build_dir}/{output_name_base}.ttx")
 
 
-def fix_head_table(xml: ET, style: str):
+def fix_head_table(config: BuildConfig, xml: ET, style: str):
     """head テーブルを編集する"""
+    # 再現可能ビルド: 作成・更新日時を SOURCE_DATE_EPOCH に固定
+    # (保存時の modified の再計算も fontTools が SOURCE_DATE_EPOCH を参照する)
+    if config.source_date_epoch is not None:
+        timestamp = timestampToString(config.source_date_epoch - epoch_diff)
+        xml.find("head/created").set("value", timestamp)
+        xml.find("head/modified").set("value", timestamp)
+
     mac_style = 0
     if "Bold" in style:
         mac_style |= 0x01
@@ -216,27 +451,30 @@ def fix_head_table(xml: ET, style: str):
     xml.find("head/macStyle").set("value", mac_style_bin)
 
 
-def fix_os2_table(xml: ET, style: str, flag_hw: bool = False):
-    """OS/2 テーブルを編集する"""
+def fix_os2_table(config: BuildConfig, xml: ET, style: str, flag_hw: bool = False, latin_width: int = None):
+    """OS/2 テーブルを編集する
+
+    latin_width: 3:5 幅の欧文の幅。字間 (customize_commit_mono.py --letter-spacing) を変えると HALF_WIDTH_35 と異なる
+    """
     # Version を 4 に固定 (USE_TYPO_METRICS のため)
     xml.find("OS_2/version").set("value", "4")
 
     # xAvgCharWidthを編集
     if flag_hw:
-        x_avg_char_width = HALF_WIDTH_12
+        x_avg_char_width = config.half_width_12
     else:
-        x_avg_char_width = HALF_WIDTH_35
+        x_avg_char_width = latin_width or config.half_width_35
     xml.find("OS_2/xAvgCharWidth").set("value", str(x_avg_char_width))
 
     # Typo メトリクス = EM サイズ (HackGen互換)
-    xml.find("OS_2/sTypoAscender").set("value", str(EM_ASCENT))
-    xml.find("OS_2/sTypoDescender").set("value", str(-EM_DESCENT))
-    xml.find("OS_2/sTypoLineGap").set("value", str(OS2_LINEGAP))
+    xml.find("OS_2/sTypoAscender").set("value", str(config.em_ascent))
+    xml.find("OS_2/sTypoDescender").set("value", str(-config.em_descent))
+    xml.find("OS_2/sTypoLineGap").set("value", str(config.os2_linegap))
 
     # HackGen互換: WinメトリクスはLineGapとは独立して設定
     # Typo方式(1.08 EM)とWin方式(1.12 EM)の差を4%に縮小し、アプリ間の一貫性を確保
-    xml.find("OS_2/usWinAscent").set("value", str(OS2_ASCENT))
-    xml.find("OS_2/usWinDescent").set("value", str(OS2_DESCENT))
+    xml.find("OS_2/usWinAscent").set("value", str(config.os2_ascent))
+    xml.find("OS_2/usWinDescent").set("value", str(config.os2_descent))
 
     # fsSelection (Bit 7 USE_TYPO_METRICS は無効化: HackGen互換)
     fs_selection = None
@@ -275,10 +513,10 @@ def fix_os2_table(xml: ET, style: str, flag_hw: bool = False):
         xml.find(f"OS_2/panose/{key}").set("value", str(value))
 
 
-def fix_hhea_table(xml: ET, style: str):
+def fix_hhea_table(config: BuildConfig, xml: ET, style: str):
     """hhea テーブルを編集する"""
-    xml.find("hhea/ascent").set("value", str(OS2_ASCENT))
-    xml.find("hhea/descent").set("value", str(-OS2_DESCENT))
+    xml.find("hhea/ascent").set("value", str(config.os2_ascent))
+    xml.find("hhea/descent").set("value", str(-config.os2_descent))
     xml.find("hhea/lineGap").set("value", "0")  # HackGen互換
 
     # Italic 調整
@@ -299,12 +537,10 @@ def fix_post_table(xml: ET):
     xml.find("post/underlinePosition").set("value", "-100")
 
 
-def fix_cmap_table(xml: ET, style: str, variant: str):
+def fix_cmap_table(config: BuildConfig, xml: ET, style: str, variant: str):
     """異体字シーケンス (cmap_format_14) をマージ後フォントに復元する。"""
-    source_xml = dump_ttx(
-        f"{FONTFORGE_PREFIX}{FONT_NAME}{variant}-{style}-jp.ttf",
-        f"{FONTFORGE_PREFIX}{FONT_NAME}{variant}-{style}-jp",
-    )
+    jp_name_base = f"{config.fontforge_prefix}{config.compact_font_name}{variant}-{style}-jp"
+    source_xml = dump_ttx(config, f"{jp_name_base}.ttf", jp_name_base)
     source_cmap_format_14 = source_xml.find("cmap/cmap_format_14")
     if source_cmap_format_14 is not None:
         target_cmap = xml.find("cmap")
@@ -314,7 +550,193 @@ def fix_cmap_table(xml: ET, style: str, variant: str):
             target_cmap.remove(existing_format_14)
         target_cmap.append(source_cmap_format_14)
     else:
-        print(f"Warning: cmap_format_14 not found in {FONTFORGE_PREFIX}{FONT_NAME}{variant}-{style}-jp.ttf")
+        print(f"Warning: cmap_format_14 not found in {jp_name_base}.ttf")
+
+
+def get_latin_width(font_path: str) -> int:
+    """欧文の幅として数字 0 (U+0030) の幅を返す。無ければ None"""
+    font = ttLib.TTFont(font_path, lazy=True)
+    try:
+        glyph_name = font.getBestCmap().get(0x0030)
+        return font["hmtx"][glyph_name][0] if glyph_name is not None else None
+    finally:
+        font.close()
+
+
+def optimize_cmap(font_path: str):
+    """最終グリフセットから cmap を再構築し、重複・不要なサブテーブルとマッピングを除く"""
+    font = ttLib.TTFont(font_path)
+    cmap_table = font["cmap"]
+    glyf = font["glyf"]
+    glyph_names = set(font.getGlyphOrder())
+
+    mapping = {cp: name for cp, name in font.getBestCmap().items() if name in glyph_names}
+
+    # IVS: 空になったグリフや存在しないグリフを指すものは除き、
+    # 基底文字と同じグリフを指すものはデフォルト扱いにする
+    uvs_dict = {}
+    for subtable in cmap_table.tables:
+        if subtable.format != 14:
+            continue
+        for selector, entries in subtable.uvsDict.items():
+            for base, glyph_name in entries:
+                if base not in mapping:
+                    continue
+                if glyph_name is not None:
+                    if glyph_name not in glyph_names:
+                        continue
+                    if glyf[glyph_name].numberOfContours == 0 and glyf[mapping[base]].numberOfContours != 0:
+                        continue
+                    if glyph_name == mapping[base]:
+                        glyph_name = None
+                uvs_dict.setdefault(selector, {})[base] = glyph_name
+    uvs_dict = {
+        selector: sorted(entries.items()) for selector, entries in sorted(uvs_dict.items())
+    }
+
+    # BMP は format 4、BMP 外の文字がある場合のみ format 12 を追加
+    # Unicode / Windows で同一内容のサブテーブルはコンパイル時に共有される
+    bmp_mapping = {cp: name for cp, name in mapping.items() if cp <= 0xFFFF}
+    tables = [
+        new_cmap_subtable(4, 0, 3, bmp_mapping),
+        new_cmap_subtable(4, 3, 1, bmp_mapping),
+    ]
+    if len(bmp_mapping) < len(mapping):
+        tables.append(new_cmap_subtable(12, 0, 4, mapping))
+        tables.append(new_cmap_subtable(12, 3, 10, mapping))
+    if uvs_dict:
+        format_14 = new_cmap_subtable(14, 0, 5, {})
+        format_14.uvsDict = uvs_dict
+        tables.append(format_14)
+    cmap_table.tables = sorted(tables, key=lambda t: (t.platformID, t.platEncID))
+
+    # 再コンパイルしてマッピングが一致することを確認
+    compiled = ttLib.getTableClass("cmap")()
+    compiled.decompile(cmap_table.compile(font), font)
+    for original, decompiled in zip(cmap_table.tables, compiled.tables):
+        if original.format == 14:
+            decompiled_uvs = {
+                selector: sorted(entries) for selector, entries in decompiled.uvsDict.items()
+            }
+            if decompiled_uvs != original.uvsDict:
+                raise ValueError(f"cmap format 14 round-trip mismatch in {font_path}")
+        elif decompiled.cmap != original.cmap:
+            raise ValueError(
+                f"cmap format {original.format} ({original.platformID}, {original.platEncID}) "
+                f"round-trip mismatch in {font_path}"
+            )
+
+    font.save(font_path)
+
+
+def new_cmap_subtable(format: int, platform_id: int, plat_enc_id: int, mapping: dict):
+    """cmap サブテーブルを作成する"""
+    subtable = CmapSubtable.newSubtable(format)
+    subtable.platformID = platform_id
+    subtable.platEncID = plat_enc_id
+    subtable.language = 0
+    subtable.cmap = dict(mapping)
+    return subtable
+
+
+def generate_webfonts(config: BuildConfig, font_paths: list):
+    """WOFF2 形式の Web フォントを CPU コア数に応じて並列で出力する"""
+    tasks = [(font_path, None) for font_path in font_paths]
+    if config.web_subset:
+        subset_names = list(WEB_SUBSETS) + ["other"]
+        tasks += [(font_path, name) for font_path in font_paths for name in subset_names]
+
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(write_woff2, *zip(*tasks)))
+
+    if config.web_subset:
+        write_font_face_css(config, [result for result in results if result["subset"] is not None])
+
+
+def write_woff2(font_path: str, subset_name: str = None) -> dict:
+    """WOFF2 ファイルを書き出す。subset_name 指定時は該当範囲のサブセットを書き出す"""
+    font = ttLib.TTFont(font_path)
+    result = {
+        "family": font["name"].getDebugName(1),
+        "weight": font["OS/2"].usWeightClass,
+        "italic": bool(font["head"].macStyle & 0x02),
+        "subset": subset_name,
+        "codepoints": [],
+    }
+
+    if subset_name is None:
+        output_path = font_path.replace(".ttf", ".woff2")
+        font.flavor = "woff2"
+        font.save(output_path)
+        result["path"] = output_path
+        print(f"write {output_path}")
+        return result
+
+    codepoints = set(font.getBestCmap())
+    if subset_name == "other":
+        codepoints = codepoints.difference(*WEB_SUBSETS.values())
+    else:
+        codepoints &= WEB_SUBSETS[subset_name]
+    if len(codepoints) == 0:
+        return result
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.name_languages = ["*"]
+    options.notdef_outline = True
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+
+    output_path = font_path.replace(".ttf", f".{subset_name}.woff2")
+    font.flavor = "woff2"
+    font.save(output_path)
+    result["path"] = output_path
+    result["codepoints"] = sorted(codepoints)
+    # IVS を持つ場合は異体字セレクタもこのサブセットで描画させる
+    if "cmap" in font and font["cmap"].getcmap(0, 5) is not None:
+        result["codepoints"] += sorted(VARIATION_SELECTORS)
+    print(f"write {output_path}")
+    return result
+
+
+def write_font_face_css(config: BuildConfig, results: list):
+    """サブセットを参照する @font-face の CSS をバリエーションごとに出力する"""
+    css_by_family = {}
+    for result in results:
+        if result.get("path") is None:
+            continue
+        css_by_family.setdefault(result["family"], []).append(
+            "@font-face {\n"
+            f'  font-family: "{result["family"]}";\n'
+            f'  src: url("{os.path.basename(result["path"])}") format("woff2");\n'
+            f"  font-weight: {result['weight']};\n"
+            f"  font-style: {'italic' if result['italic'] else 'normal'};\n"
+            "  font-display: swap;\n"
+            f"  unicode-range: {to_unicode_range(result['codepoints'])};\n"
+            "}\n"
+        )
+
+    for family, rules in css_by_family.items():
+        css_path = f"{config.build_fonts_dir}/{family.replace(' ', '')}.css"
+        with open(css_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(rules))
+        print(f"write {css_path}")
+
+
+def to_unicode_range(codepoints: list) -> str:
+    """コードポイントを CSS の unicode-range 表記に変換する"""
+    ranges = []
+    for cp in sorted(set(codepoints)):
+        if ranges and ranges[-1][1] == cp - 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ", ".join(
+        f"U+{start:X}" if start == end else f"U+{start:X}-{end:X}" for start, end in ranges
+    )
 
 
 if __name__ == "__main__":
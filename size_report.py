@@ -0,0 +1,145 @@
+#!/bin/env python3
+
+import glob
+import json
+import os
+import sys
+from pathlib import Path
+
+from fontTools import ttLib
+
+from build_config import BuildConfig
+
+HISTORY_FILE = "size_history.json"
+# これより小さい増加は許容量を超えても報告しない (バイト)
+MIN_FLAGGED_GROWTH = 1024
+
+
+def main():
+    config = BuildConfig.load()
+    history_path = HISTORY_FILE
+    fail_over_budget = False
+    targets = []
+
+    for arg in sys.argv[1:]:
+        if arg.startswith("--history="):
+            history_path = arg.split("=", 1)[1]
+        elif arg == "--fail-over-budget":
+            fail_over_budget = True
+        elif arg.startswith("--"):
+            print(f"Unknown option: {arg}")
+            usage()
+            sys.exit(1)
+        else:
+            targets.append(arg)
+
+    font_paths = []
+    for target in targets or ["dist"]:
+        if os.path.isdir(target):
+            font_paths += sorted(glob.glob(f"{target}/*.ttf"))
+        else:
+            font_paths.append(target)
+    if len(font_paths) == 0:
+        print(f"Error: no fonts found in {', '.join(targets or ['dist'])}")
+        sys.exit(1)
+
+    fonts = {Path(font_path).name: measure_font(font_path) for font_path in font_paths}
+
+    history = []
+    if os.path.exists(history_path):
+        with open(history_path, "r", encoding="utf-8") as f:
+            history = json.load(f)
+    # 同じバージョンの再ビルドは最新の記録を置き換える
+    if history and history[-1]["version"] == config.version:
+        history.pop()
+    previous = history[-1] if history else None
+
+    over_budget = []
+    if previous is not None:
+        over_budget = find_over_budget(previous["fonts"], fonts, config.size_budget_percent)
+
+    print_report(fonts, previous)
+    for message in over_budget:
+        # GitHub Actions では警告として表示する
+        prefix = "::warning::" if os.environ.get("GITHUB_ACTIONS") else "warning: "
+        print(f"{prefix}{message}")
+
+    history.append(
+        {
+            "version": config.version,
+            "budget_percent": config.size_budget_percent,
+            "over_budget": over_budget,
+            "fonts": fonts,
+        }
+    )
+    with open(history_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"write {history_path}")
+
+    if fail_over_budget and over_budget:
+        sys.exit(1)
+
+
+def usage():
+    print(
+        f"Usage: {sys.argv[0]} "
+        "[--history=<path>] [--fail-over-budget] [<dir or font> ...]\n"
+        f"  --history=<path>    記録する履歴ファイル (デフォルト: {HISTORY_FILE})\n"
+        "  --fail-over-budget  SIZE_BUDGET_PERCENT を超えて増えた場合は終了コード 1 を返す\n"
+        "  フォントを省略した場合は dist/*.ttf を記録する"
+    )
+
+
+def measure_font(font_path: str) -> dict:
+    """フォントのファイルサイズ・グリフ数・テーブルごとのサイズを返す"""
+    font = ttLib.TTFont(font_path, lazy=True)
+    try:
+        return {
+            "size": os.path.getsize(font_path),
+            "glyphs": font["maxp"].numGlyphs,
+            # テーブルをデコードせず、ディレクトリ上のサイズを使う
+            "tables": {tag.strip(): entry.length for tag, entry in sorted(font.reader.tables.items())},
+        }
+    finally:
+        font.close()
+
+
+def find_over_budget(previous_fonts: dict, fonts: dict, budget_percent: float) -> list:
+    """前回の記録から budget_percent を超えて増えたファイル・テーブルを返す"""
+    messages = []
+    for font_name, font in sorted(fonts.items()):
+        if font_name not in previous_fonts:
+            continue
+        previous_font = previous_fonts[font_name]
+        sizes = [("total", previous_font["size"], font["size"])] + [
+            (tag, previous_font["tables"][tag], size)
+            for tag, size in font["tables"].items()
+            if tag in previous_font["tables"]
+        ]
+        for name, previous_size, size in sizes:
+            if size - previous_size < MIN_FLAGGED_GROWTH:
+                continue
+            if previous_size > 0 and size > previous_size * (1 + budget_percent / 100):
+                messages.append(
+                    f"{font_name} {name}: {previous_size:,} -> {size:,} bytes "
+                    f"({size / previous_size - 1:+.1%}, budget {budget_percent:g}%)"
+                )
+    return messages
+
+
+def print_report(fonts: dict, previous: dict):
+    """フォントごとのサイズと前回からの増減を表示する"""
+    previous_fonts = previous["fonts"] if previous is not None else {}
+    for font_name, font in sorted(fonts.items()):
+        line = f"{font_name}: {font['size']:,} bytes, {font['glyphs']:,} glyphs"
+        if font_name in previous_fonts:
+            diff = font["size"] - previous_fonts[font_name]["size"]
+            line += f" ({diff:+,} bytes since {previous['version']})"
+        print(line)
+        largest = sorted(font["tables"].items(), key=lambda item: -item[1])[:6]
+        print("  " + ", ".join(f"{tag} {size:,}" for tag, size in largest))
+
+
+if __name__ == "__main__":
+    main()
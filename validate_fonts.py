@@ -0,0 +1,260 @@
+#!/bin/env python3
+
+import glob
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from fontTools import ttLib
+
+from build_config import JPDOC_SYMBOL_RANGES, BuildConfig
+
+STYLES = ["BoldItalic", "Regular", "Bold", "Italic"]
+
+# fsSelection: bit 0 ITALIC, bit 5 BOLD, bit 6 REGULAR
+FS_SELECTION_MASK = 0b1100001
+FS_SELECTION = {
+    "Regular": 0b1000000,
+    "Italic": 0b0000001,
+    "Bold": 0b0100000,
+    "BoldItalic": 0b0100001,
+}
+# macStyle: bit 0 Bold, bit 1 Italic
+MAC_STYLE_MASK = 0b11
+MAC_STYLE = {
+    "Regular": 0b00,
+    "Italic": 0b10,
+    "Bold": 0b01,
+    "BoldItalic": 0b11,
+}
+
+# エラーに列挙するグリフ名・コードポイントの最大数
+MAX_LISTED = 20
+
+# jpdoc で意図的に欧文フォントから削除するコードポイント
+# (uni25XX という名前のグリフも削除されるため U+2500-25FF を含める)
+JPDOC_REMOVED_CODEPOINTS = frozenset(
+    cp for first, last in JPDOC_SYMBOL_RANGES + ((0x2500, 0x25FF),) for cp in range(first, last + 1)
+)
+
+
+def main():
+    config = BuildConfig.load()
+    report_path = None
+    targets = []
+
+    for arg in sys.argv[1:]:
+        if arg.startswith("--report="):
+            report_path = arg.split("=", 1)[1]
+        elif arg.startswith("--regular-weight="):
+            config = config.replace(reg_weight=int(arg.split("=", 1)[1]))
+        elif arg.startswith("--bold-weight="):
+            config = config.replace(bold_weight=int(arg.split("=", 1)[1]))
+        elif arg.startswith("--"):
+            print(f"Unknown option: {arg}")
+            usage()
+            sys.exit(1)
+        else:
+            targets.append(arg)
+
+    font_paths = []
+    for target in targets or ["dist"]:
+        if os.path.isdir(target):
+            font_paths += sorted(glob.glob(f"{target}/*.ttf"))
+        else:
+            font_paths.append(target)
+    if len(font_paths) == 0:
+        print(f"Error: no fonts found in {', '.join(targets or ['dist'])}")
+        sys.exit(1)
+
+    report = validate_fonts(config, font_paths)
+
+    for result in report["fonts"]:
+        status = "OK" if not result["errors"] else "NG"
+        print(f"[{status}] {result['path']}")
+        for error in result["errors"]:
+            print(f"    error: {error}")
+        for warning in result["warnings"]:
+            print(f"    warning: {warning}")
+    print(f"{len(report['fonts']) - report['failed']}/{len(report['fonts'])} fonts passed")
+
+    if report_path is not None:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+    if report["failed"] > 0:
+        sys.exit(1)
+
+
+def usage():
+    print(
+        f"Usage: {sys.argv[0]} "
+        "[--report=<path>] [--regular-weight=<n>] [--bold-weight=<n>] [<dir or font> ...]\n"
+        "  --report=<path>       検証結果を JSON で出力する\n"
+        "  --regular-weight=<n>  収録を確認する欧文元フォントの Regular ウェイト (デフォルト: 400)\n"
+        "  --bold-weight=<n>     収録を確認する欧文元フォントの Bold ウェイト (デフォルト: 700)\n"
+        "  フォントを省略した場合は dist/*.ttf を検証する"
+    )
+
+
+def validate_fonts(config: BuildConfig, font_paths: list) -> dict:
+    """フォントを CPU コア数に応じて並列で検証する"""
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(validate_font, [config] * len(font_paths), font_paths))
+    return {
+        "fonts": results,
+        "failed": sum(1 for result in results if result["errors"]),
+    }
+
+
+def validate_font(config: BuildConfig, font_path: str) -> dict:
+    """1つのフォントを検証する"""
+    result = {"path": font_path, "errors": [], "warnings": []}
+    stem = Path(font_path).stem
+    style = next((s for s in STYLES if stem.endswith(f"-{s}")), None)
+    if style is None:
+        result["errors"].append(f"style not found in file name: {stem}")
+        return result
+
+    # 必要なテーブルのみ読み込む
+    font = ttLib.TTFont(font_path, lazy=True)
+    try:
+        check_widths(config, font, stem, result)
+        check_style_flags(font, style, result)
+        check_fixed_pitch(font, result)
+        check_cmap(config, font, stem, style, result)
+    except Exception as e:
+        result["errors"].append(f"{type(e).__name__}: {e}")
+    finally:
+        font.close()
+    return result
+
+
+def check_widths(config: BuildConfig, font: ttLib.TTFont, stem: str, result: dict):
+    """全グリフの幅が 0・半角幅・全角幅のいずれかであることを確認する
+
+    半角幅は字間 (customize_commit_mono.py --letter-spacing) で変わるため、数字 0 (U+0030) の幅を使う
+    """
+    glyph_name = font.getBestCmap().get(0x0030)
+    latin_width = font["hmtx"][glyph_name][0] if glyph_name is not None else None
+    if stem.startswith(f"{config.compact_font_name}{config.full_width_35_str}"):
+        half_width = latin_width or config.half_width_35
+        # 日本語の半角グリフは字間に関わらず HALF_WIDTH_35 に揃えている
+        allowed_widths = {0, half_width, config.half_width_35, config.full_width_35}
+    else:
+        half_width = latin_width or config.half_width_12
+        allowed_widths = {0, half_width, half_width * 2}
+
+    invalid_glyphs = sorted(
+        name for name, (width, _) in font["hmtx"].metrics.items() if width not in allowed_widths
+    )
+    if invalid_glyphs:
+        result["errors"].append(
+            f"{len(invalid_glyphs)} glyphs have widths other than "
+            f"{sorted(allowed_widths)}: {', '.join(invalid_glyphs[:MAX_LISTED])}"
+        )
+
+    x_avg_char_width = font["OS/2"].xAvgCharWidth
+    if x_avg_char_width != half_width:
+        result["errors"].append(f"OS/2 xAvgCharWidth is {x_avg_char_width}, expected {half_width}")
+
+
+def check_style_flags(font: ttLib.TTFont, style: str, result: dict):
+    """fsSelection と macStyle がスタイルと一致することを確認する"""
+    fs_selection = font["OS/2"].fsSelection & FS_SELECTION_MASK
+    if fs_selection != FS_SELECTION[style]:
+        result["errors"].append(
+            f"OS/2 fsSelection style bits are {fs_selection:07b}, expected {FS_SELECTION[style]:07b}"
+        )
+
+    mac_style = font["head"].macStyle & MAC_STYLE_MASK
+    if mac_style != MAC_STYLE[style]:
+        result["errors"].append(
+            f"head macStyle style bits are {mac_style:02b}, expected {MAC_STYLE[style]:02b}"
+        )
+
+
+def check_fixed_pitch(font: ttLib.TTFont, result: dict):
+    """post テーブルの isFixedPitch が有効であることを確認する"""
+    if font["post"].isFixedPitch == 0:
+        result["errors"].append("post isFixedPitch is 0")
+
+
+def check_cmap(config: BuildConfig, font: ttLib.TTFont, stem: str, style: str, result: dict):
+    """日本語・欧文の元フォントの文字をすべて収録し、異体字シーケンスを持つことを確認する"""
+    cmap = font.getBestCmap()
+
+    sources = [
+        ("JP", jp_source_codepoints(config, style)),
+        ("Latin", eng_source_codepoints(config, eng_source_style(config, stem, style))),
+    ]
+    for source_name, source_codepoints in sources:
+        if source_codepoints is None:
+            result["warnings"].append(f"{source_name} source font not found, cmap coverage not checked")
+            continue
+        missing = sorted(source_codepoints - cmap.keys())
+        if missing:
+            result["errors"].append(
+                f"{len(missing)} code points from the {source_name} source font are missing: "
+                + ", ".join(f"U+{cp:04X}" for cp in missing[:MAX_LISTED])
+            )
+
+    if font["cmap"].getcmap(0, 5) is None:
+        result["errors"].append("cmap format 14 (Unicode Variation Sequences) not found")
+
+
+@lru_cache(maxsize=None)
+def jp_source_codepoints(config: BuildConfig, style: str) -> frozenset:
+    """日本語元フォントのコードポイントを返す。元フォントが無ければ None"""
+    # 日本語フォントは Regular / Bold のみ
+    jp_style = "Bold" if "Bold" in style else "Regular"
+    source_path = f"{config.source_fonts_dir}/{config.jp_font.replace('{style}', jp_style)}"
+    return source_codepoints(source_path)
+
+
+def eng_source_style(config: BuildConfig, stem: str, style: str) -> str:
+    """フォントに対応する欧文元フォントのスタイル (例: 400-Regular) を返す"""
+    # 複数ウェイトのビルドではファイル名にウェイトが入る (例: ...W300B600-Regular)
+    match = re.search(r"W(\d+)B(\d+)-", stem)
+    if match:
+        reg_weight, bold_weight = int(match[1]), int(match[2])
+    else:
+        reg_weight, bold_weight = config.reg_weight, config.bold_weight
+    weight = bold_weight if "Bold" in style else reg_weight
+    return f"{weight}-{'Italic' if 'Italic' in style else 'Regular'}"
+
+
+@lru_cache(maxsize=None)
+def eng_source_codepoints(config: BuildConfig, eng_style: str) -> frozenset:
+    """欧文元フォントのコードポイントから jpdoc で削除するものを除いて返す。元フォントが無ければ None
+
+    remove_jpdoc_symbols で高さにより削除されたグリフは日本語フォント側で補う必要があるため除かない。
+    """
+    source_path = f"{config.source_fonts_dir}/{config.eng_font.replace('{style}', eng_style)}"
+    # 可変フォントからインスタンス化したウェイトは .ttf
+    if not os.path.exists(source_path):
+        source_path = os.path.splitext(source_path)[0] + ".ttf"
+    codepoints = source_codepoints(source_path)
+    if codepoints is None:
+        return None
+    return codepoints - JPDOC_REMOVED_CODEPOINTS
+
+
+def source_codepoints(source_path: str) -> frozenset:
+    """元フォントのコードポイントを返す。元フォントが無ければ None"""
+    if not os.path.exists(source_path):
+        return None
+    source_font = ttLib.TTFont(source_path, lazy=True)
+    try:
+        return frozenset(source_font.getBestCmap())
+    finally:
+        source_font.close()
+
+
+if __name__ == "__main__":
+    main()
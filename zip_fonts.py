@@ -0,0 +1,46 @@
+#!/bin/env python3
+
+import os
+import sys
+import time
+import zipfile
+
+# ZIP 形式で表現できる最も古い日時 (1980-01-01 00:00:00 UTC)
+ZIP_EPOCH = 315532800
+
+
+def main():
+    if len(sys.argv) < 3:
+        usage()
+        sys.exit(1)
+    write_zip(sys.argv[1], sys.argv[2:], os.environ.get("SOURCE_DATE_EPOCH"))
+
+
+def usage():
+    print(
+        f"Usage: {sys.argv[0]} <output.zip> <file> ...\n"
+        "  SOURCE_DATE_EPOCH が設定されている場合、エントリの日時を固定して\n"
+        "  同じ入力から同じバイト列の ZIP を出力する"
+    )
+
+
+def write_zip(zip_path: str, file_paths: list, source_date_epoch: str = None):
+    """ファイルを名前順に ZIP にまとめる"""
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
+        for file_path in sorted(file_paths, key=os.path.basename):
+            if source_date_epoch is None:
+                z.write(file_path, os.path.basename(file_path))
+                continue
+
+            # 日時・作成 OS・パーミッションを固定する
+            date_time = time.gmtime(max(int(source_date_epoch), ZIP_EPOCH))[:6]
+            info = zipfile.ZipInfo(os.path.basename(file_path), date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3  # Unix
+            info.external_attr = 0o644 << 16
+            with open(file_path, "rb") as f:
+                z.writestr(info, f.read())
+
+
+if __name__ == "__main__":
+    main()